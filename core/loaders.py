@@ -0,0 +1,437 @@
+# File: core/loaders.py
+# Loading real multi-issue approval data into MultiIssueElection.
+#
+# Two text formats are supported:
+#
+#   • PrefLib-style approval files: metadata lines start with '#', every other
+#     line is "count: {a,b},{c},{}" with one set of approved candidates per
+#     issue (candidates numbered from 1, as in PrefLib). Optional metadata:
+#         # CANDIDATES PER ISSUE: 3,3,2
+#         # NUMBER VOTERS: 120000
+#     Without the first, the number of candidates of an issue is its largest
+#     approved index.
+#
+#   • Wide 0/1 CSV ballot dumps: a header row and one 0/1 row per ballot. The
+#     header names are "<issue>:<candidate>" (columns grouped by issue in order
+#     of appearance) unless `candidates_per_issue` is given. An optional
+#     "count" column repeats a ballot.
+#
+# Text is parsed in bulk chunks of lines, validated, and stored as an int8
+# matrix. The first load writes a binary cache next to the source (or in
+# `cache_dir`): <name>.approvals.npy plus <name>.meta.json. Later loads
+# memory-map the .npy file, so opening a dataset costs no parsing and pages
+# are only read when the rules touch them. The cache is rebuilt whenever the
+# source's size or modification time differs from the recorded one. If it
+# cannot be written (e.g. a read-only dataset directory), the parsed election
+# is returned uncached with a warning.
+
+import json
+import os
+import re
+import warnings
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from core.types import MultiIssueElection
+
+CHUNK_LINES = 100_000
+PREFLIB_CHUNK_LINES = 10_000  # tokenized per byte, so kept smaller
+CACHE_VERSION = 1
+
+_SET = re.compile(r"\{([^{}]*)\}")
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def _offsets(candidates_per_issue: Sequence[int]) -> np.ndarray:
+    counts = np.asarray(candidates_per_issue, dtype=np.int64)
+    if counts.ndim != 1 or len(counts) == 0 or np.any(counts < 1):
+        raise ValueError(f"invalid candidates per issue: {list(candidates_per_issue)}")
+    return np.concatenate([[0], np.cumsum(counts)])
+
+
+def _election(columns: np.ndarray, offsets: np.ndarray) -> MultiIssueElection:
+    """Election over a (n_voters, total_candidates) matrix, without copying it."""
+    counts = np.diff(offsets)
+    if len(set(counts.tolist())) == 1:
+        return MultiIssueElection(columns.reshape(columns.shape[0], len(counts), int(counts[0])))
+    return MultiIssueElection(columns, offsets)
+
+
+def _chunks(lines: Iterable[str], size: int = CHUNK_LINES) -> Iterable[List[str]]:
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# -------------------------
+# Parsers
+# -------------------------
+def _parse_preflib_line(path: str, lineno: int, line: str, expected: Optional[int]) -> Tuple[int, List[List[int]]]:
+    """Count and 0-based approval sets of one ballot line, with exact error messages."""
+    head, sep, body = line.partition(":")
+    try:
+        count = int(head)
+    except ValueError:
+        count = -1
+    if not sep or count < 1:
+        raise ValueError(f"{path}:{lineno}: expected 'count: {{...}},...', got {line!r}")
+    sets = _SET.findall(body)
+    # the sets, separated by exactly one comma each (whitespace aside)
+    if "".join(_SET.sub("{}", body).split()) != ",".join(["{}"] * len(sets)):
+        raise ValueError(f"{path}:{lineno}: malformed approval sets {body.strip()!r}")
+    try:
+        issues = [[int(c) - 1 for c in s.split(",") if c.strip()] for s in sets]
+    except ValueError:
+        raise ValueError(f"{path}:{lineno}: candidates must be integers") from None
+    expected = len(issues) if expected is None else expected
+    if len(issues) != expected:
+        raise ValueError(f"{path}:{lineno}: {len(issues)} issues, expected {expected}")
+    for cands in issues:
+        if any(c < 0 for c in cands) or len(set(cands)) != len(cands):
+            raise ValueError(f"{path}:{lineno}: candidates must be distinct and >= 1")
+    return count, issues
+
+
+def _scan_preflib_chunk(a: np.ndarray, n_lines: int, expected: Optional[int]):
+    """
+    Tokenize a chunk of ballot lines at once on their bytes (`a`, uint8,
+    every line ending in a newline).
+
+    Returns (n_issues, counts, line, issue, cand): one count per line and one
+    coordinate per approval (candidates 0-based), or None if any line is not plainly
+    well-formed; the caller then parses the chunk line by line, which reports
+    the exact error.
+    """
+    newline = a == ord("\n")
+    digit = (a >= ord("0")) & (a <= ord("9"))
+    opens, closes, colon, comma = a == ord("{"), a == ord("}"), a == ord(":"), a == ord(",")
+    solid = ~((a == ord(" ")) | (a == ord("\t")) | (a == ord("\r")))
+    if not np.all(digit | opens | closes | colon | comma | newline | ~solid):
+        return None
+
+    line_of = np.cumsum(newline, dtype=np.int32) - newline
+    if np.any(np.bincount(line_of[colon], minlength=n_lines) != 1):
+        return None
+    after = np.cumsum(colon, dtype=np.int32) - line_of == 1  # from the line's colon on
+    depth = np.cumsum(opens.astype(np.int8) - closes.astype(np.int8), dtype=np.int32)
+    if (np.any((depth < 0) | (depth > 1)) or np.any(depth[newline] != 0)
+            or np.any((opens | comma) & ~after)):
+        return None
+    n_sets = np.bincount(line_of[opens], minlength=n_lines)
+    if np.any(n_sets != (n_sets[0] if expected is None else expected)):
+        return None
+
+    # Digit runs and the nearest non-blank bytes around them
+    first = digit & ~np.concatenate([[False], digit[:-1]])
+    starts = np.flatnonzero(first)
+    ends = np.flatnonzero(digit & ~np.concatenate([digit[1:], [False]])) + 1
+    if np.any(ends - starts > 18):
+        return None
+    index = np.arange(len(a), dtype=np.int32)
+    prev_solid = np.maximum.accumulate(np.where(solid, index, -1))
+    next_solid = np.minimum.accumulate(np.where(solid, index, len(a))[::-1])[::-1]
+    before = np.where(starts > 0, prev_solid[starts - 1], -1)
+    prev_byte = np.where(before >= 0, a[np.maximum(before, 0)], ord("\n"))
+    follow = a[next_solid[ends]]  # a run ends before its line's newline at the latest
+
+    # Exactly one comma between consecutive sets of a line, none around them
+    sep = np.flatnonzero(comma & (depth == 0))
+    if (np.any(np.bincount(line_of[sep], minlength=n_lines) != n_sets - 1)
+            or np.any(a[prev_solid[sep - 1]] != ord("}")) or np.any(a[next_solid[sep + 1]] != ord("{"))):
+        return None
+
+    is_count = ~after[starts]
+    ok_count = (prev_byte == ord("\n")) & (follow == ord(":"))
+    ok_cand = ((depth[starts] == 1) & ((prev_byte == ord("{")) | (prev_byte == ord(",")))
+               & ((follow == ord("}")) | (follow == ord(","))))
+    if np.any(np.where(is_count, ~ok_count, ~ok_cand)):
+        return None
+
+    run_of = np.cumsum(first, dtype=np.int32)[digit] - 1
+    powers = 10 ** np.arange(18, dtype=np.int64)
+    weighted = (a[digit] - ord("0")).astype(np.int64) * powers[ends[run_of] - index[digit] - 1]
+    values = np.add.reduceat(weighted, np.flatnonzero(first[digit])) if len(starts) else weighted
+
+    runs_line = line_of[starts]
+    if np.any(np.bincount(runs_line[is_count], minlength=n_lines) != 1):
+        return None
+    counts = values[is_count]
+    line = runs_line[~is_count]
+    opens_seen = np.cumsum(opens, dtype=np.int32)
+    line_starts = np.concatenate([[0], np.flatnonzero(newline)[:-1] + 1])
+    issue = opens_seen[starts[~is_count]] - (opens_seen[line_starts] - opens[line_starts])[line] - 1
+    cand = values[~is_count] - 1
+    if np.any(counts < 1) or np.any(cand < 0):
+        return None
+    return int(n_sets[0]), counts, line, issue, cand
+
+
+def _preflib_block(n_lines: int, n_issues: int, line, issue, cand):
+    """
+    int8 block of a chunk's distinct ballots, laid out with per-issue widths
+    of the chunk's largest candidate, plus those offsets; None if a ballot
+    approves a candidate twice.
+    """
+    widths = np.ones(n_issues, dtype=np.int64)
+    np.maximum.at(widths, issue, cand + 1)
+    offsets = np.concatenate([[0], np.cumsum(widths)])
+    total = int(offsets[-1])
+    hits = np.bincount(line * total + offsets[issue] + cand, minlength=n_lines * total)
+    if len(hits) and hits.max() > 1:
+        return None
+    return hits.astype(np.int8).reshape(n_lines, total), offsets
+
+
+def read_preflib(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse a PrefLib-style multi-issue approval file.
+
+    Lines are read in chunks of PREFLIB_CHUNK_LINES. A chunk is tokenized in bulk into
+    approval coordinates and stored as an int8 block of its ballots (lines
+    that are not plainly well-formed send the chunk through the per-line
+    parser, which reports the error); blocks are expanded by their counts
+    into the result at the end.
+
+    Returns
+    -------
+    columns : np.ndarray (n_voters, total_candidates) of int8
+    offsets : np.ndarray (n_issues + 1,)
+    """
+    declared_cands: Optional[List[int]] = None
+    declared_voters: Optional[int] = None
+    n_issues: Optional[int] = None
+    blocks = []  # (block, block offsets, counts) per chunk
+
+    with open(path) as f:
+        first_lineno = 1
+        for chunk in _chunks(f, PREFLIB_CHUNK_LINES):
+            linenos = range(first_lineno, first_lineno + len(chunk))
+            first_lineno += len(chunk)
+            text = "".join(chunk)
+            a = np.frombuffer((text if text.endswith("\n") else text + "\n").encode(), dtype=np.uint8)
+            heads = a[np.concatenate([[0], np.flatnonzero(a[:-1] == ord("\n")) + 1])]
+            if np.any(np.isin(heads, np.frombuffer(b"# \t\r\n", dtype=np.uint8))):
+                # metadata or blank lines (usually only in the first chunk)
+                numbered = []
+                for lineno, line in zip(linenos, chunk):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if line.startswith("#"):
+                        key, _, value = line[1:].partition(":")
+                        key = key.strip().upper()
+                        if key == "CANDIDATES PER ISSUE":
+                            declared_cands = [int(v) for v in value.split(",")]
+                        elif key == "NUMBER VOTERS":
+                            declared_voters = int(value)
+                        continue
+                    numbered.append((lineno, line))
+                if not numbered:
+                    continue
+                a = np.frombuffer("".join(line + "\n" for _, line in numbered).encode(), dtype=np.uint8)
+            else:
+                numbered = None  # built only if the chunk needs the per-line parser
+
+            n_lines = len(chunk) if numbered is None else len(numbered)
+            expected = len(declared_cands) if declared_cands else n_issues
+            scanned = _scan_preflib_chunk(a, n_lines, expected)
+            block = None
+            if scanned is not None:
+                n_issues, counts, line, issue, cand = scanned
+                block = _preflib_block(n_lines, n_issues, line, issue, cand)
+            if block is None:
+                if numbered is None:
+                    numbered = [(lineno, line.strip()) for lineno, line in zip(linenos, chunk)]
+                parsed = []
+                for lineno, line in numbered:
+                    parsed.append(_parse_preflib_line(path, lineno, line, expected))
+                    expected = len(parsed[-1][1])
+                n_issues = expected
+                counts = np.array([c for c, _ in parsed], dtype=np.int64)
+                coords = np.array([(r, i, c) for r, (_, issues) in enumerate(parsed)
+                                   for i, cands in enumerate(issues) for c in cands], dtype=np.int64)
+                block = _preflib_block(len(counts), n_issues, *coords.reshape(-1, 3).T)
+            blocks.append((*block, counts))
+
+    if not blocks:
+        raise ValueError(f"{path}: no ballots")
+    largest = np.max([np.diff(block_offsets) for _, block_offsets, _ in blocks], axis=0)
+    if declared_cands is None:
+        declared_cands = largest.tolist()
+    elif len(declared_cands) != n_issues or np.any(largest > declared_cands):
+        raise ValueError(f"{path}: ballots do not fit CANDIDATES PER ISSUE {declared_cands}")
+    offsets = _offsets(declared_cands)
+
+    n_voters = int(sum(int(counts.sum()) for _, _, counts in blocks))
+    if declared_voters is not None and declared_voters != n_voters:
+        raise ValueError(f"{path}: NUMBER VOTERS is {declared_voters}, ballots add up to {n_voters}")
+    columns = np.zeros((n_voters, int(offsets[-1])), dtype=np.int8)
+    row = 0
+    for block, block_offsets, counts in blocks:
+        expanded = block if np.all(counts == 1) else np.repeat(block, counts, axis=0)
+        for i in range(n_issues):
+            lo, hi = block_offsets[i], block_offsets[i + 1]
+            columns[row:row + len(expanded), offsets[i]:offsets[i] + hi - lo] = expanded[:, lo:hi]
+        row += len(expanded)
+    return columns, offsets
+
+
+def read_approval_csv(
+    path: str,
+    candidates_per_issue: Optional[Sequence[int]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse a wide 0/1 CSV ballot dump (see module notes).
+
+    Returns
+    -------
+    columns : np.ndarray (n_voters, total_candidates) of int8
+    offsets : np.ndarray (n_issues + 1,)
+    """
+    with open(path) as f:
+        header = [h.strip() for h in f.readline().strip().split(",")]
+        count_col = header.index("count") if "count" in header else None
+        names = [h for h in header if h != "count"]
+
+        if candidates_per_issue is None:
+            issues: List[str] = []
+            for name in names:
+                issue, sep, _ = name.rpartition(":")
+                if not sep:
+                    raise ValueError(f"{path}: header {name!r} is not '<issue>:<candidate>' "
+                                     "(pass candidates_per_issue instead)")
+                if issue not in issues:
+                    issues.append(issue)
+                elif issues[-1] != issue:
+                    raise ValueError(f"{path}: columns of issue {issue!r} are not contiguous")
+            candidates_per_issue = [sum(n.rpartition(":")[0] == i for n in names) for i in issues]
+        offsets = _offsets(candidates_per_issue)
+        if offsets[-1] != len(names):
+            raise ValueError(f"{path}: {len(names)} candidate columns, expected {int(offsets[-1])}")
+
+        parts, start = [], 2
+        for chunk in _chunks(f):
+            try:
+                block = np.loadtxt(chunk, delimiter=",", dtype=np.int64, ndmin=2)
+            except ValueError as err:
+                raise ValueError(f"{path}: bad ballot row near line {start}: {err}") from None
+            if block.shape[1] != len(header):
+                raise ValueError(f"{path}: rows near line {start} have {block.shape[1]} fields, "
+                                 f"expected {len(header)}")
+            values = block if count_col is None else np.delete(block, count_col, axis=1)
+            bad = np.flatnonzero(((values != 0) & (values != 1)).any(axis=1))
+            if len(bad):
+                raise ValueError(f"{path}:{start + bad[0]}: approvals must be 0 or 1")
+            values = values.astype(np.int8)
+            if count_col is not None:
+                reps = block[:, count_col]
+                if np.any(reps < 1):
+                    raise ValueError(f"{path}:{start + np.flatnonzero(reps < 1)[0]}: count must be >= 1")
+                values = np.repeat(values, reps, axis=0)
+            parts.append(values)
+            start += len(chunk)
+
+    if not parts:
+        raise ValueError(f"{path}: no ballots")
+    return np.concatenate(parts), offsets
+
+
+# -------------------------
+# Cache
+# -------------------------
+def _cache_paths(path: str, cache_dir: Optional[str]) -> Tuple[str, str]:
+    directory = cache_dir if cache_dir is not None else os.path.dirname(os.path.abspath(path))
+    stem = os.path.join(directory, os.path.basename(path))
+    return stem + ".approvals.npy", stem + ".meta.json"
+
+
+def _source_stamp(path: str, reader: str, options) -> dict:
+    st = os.stat(path)
+    return {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "reader": reader,
+        "options": options,
+    }
+
+
+def _load_cached(npy: str, meta_file: str, stamp: dict) -> Optional[MultiIssueElection]:
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(meta.get(k) != v for k, v in stamp.items()) or not os.path.exists(npy):
+        return None
+    columns = np.load(npy, mmap_mode="r")
+    if columns.shape != (meta["n_voters"], meta["offsets"][-1]):
+        return None
+    return _election(columns, np.asarray(meta["offsets"], dtype=np.int64))
+
+
+def _write_cache(npy: str, meta_file: str, stamp: dict, columns: np.ndarray, offsets: np.ndarray) -> None:
+    os.makedirs(os.path.dirname(npy), exist_ok=True)
+    tmp = npy + ".tmp.npy"
+    np.save(tmp, columns)
+    os.replace(tmp, npy)
+    meta = {**stamp, "n_voters": int(columns.shape[0]), "offsets": [int(o) for o in offsets]}
+    with open(meta_file + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_file + ".tmp", meta_file)
+
+
+def _load(path: str, reader: str, options, cache: bool, cache_dir: Optional[str]) -> MultiIssueElection:
+    if cache:
+        npy, meta_file = _cache_paths(path, cache_dir)
+        stamp = _source_stamp(path, reader, options)
+        elec = _load_cached(npy, meta_file, stamp)
+        if elec is not None:
+            return elec
+
+    if reader == "preflib":
+        columns, offsets = read_preflib(path)
+    else:
+        columns, offsets = read_approval_csv(path, options)
+
+    if cache:
+        try:
+            _write_cache(npy, meta_file, stamp, columns, offsets)
+        except OSError as err:
+            warnings.warn(f"{path}: cannot write the cache ({err}); loading uncached", stacklevel=3)
+        else:
+            return _load_cached(npy, meta_file, stamp)
+    return _election(columns, offsets)
+
+
+# -------------------------
+# Public loaders
+# -------------------------
+def load_preflib(path: str, cache: bool = True, cache_dir: Optional[str] = None) -> MultiIssueElection:
+    """Load a PrefLib-style multi-issue approval file (cached, see module notes)."""
+    return _load(path, "preflib", None, cache, cache_dir)
+
+
+def load_approval_csv(
+    path: str,
+    candidates_per_issue: Optional[Sequence[int]] = None,
+    cache: bool = True,
+    cache_dir: Optional[str] = None,
+) -> MultiIssueElection:
+    """Load a wide 0/1 CSV ballot dump (cached, see module notes)."""
+    options = None if candidates_per_issue is None else [int(m) for m in candidates_per_issue]
+    return _load(path, "csv", options, cache, cache_dir)
+
+
+def load_election(path: str, **kwargs) -> MultiIssueElection:
+    """Load `path` with the loader matching its extension (.csv, otherwise PrefLib-style)."""
+    if path.lower().endswith(".csv"):
+        return load_approval_csv(path, **kwargs)
+    return load_preflib(path, **kwargs)
@@ -0,0 +1,193 @@
+# File: core/sparse.py
+# Sparse backend for multi-issue approval elections.
+#
+# Approvals are stored column-wise (CSC): for every candidate column the
+# sorted list of voters approving it. Memory and the work done by the rules
+# and detectors scale with the number of approvals instead of
+# n_voters * total_candidates, which matters for low-density profiles with
+# many candidates per issue.
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import numpy as np
+
+from core.types import MultiIssueElection
+
+
+@dataclass
+class SparseMultiIssueElection:
+    """
+    Multi-issue approval election in compressed sparse column form.
+
+    Provides the same layout-independent accessors as `MultiIssueElection`
+    (n_voters, n_issues, candidate_counts, column_offsets, column, voter_row,
+    approves, drop_approvals, copy), so the rules, detectors and welfare
+    functions accept either.
+
+    Attributes
+    ----------
+    n_voters : int
+    offsets : np.ndarray
+        Column offsets of the issues, length n_issues + 1.
+    indptr : np.ndarray
+        Length total_candidates + 1; column c is approved by
+        indices[indptr[c]:indptr[c+1]].
+    indices : np.ndarray
+        Voter indices, ascending within each column.
+    """
+    n_voters: int
+    offsets: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    _rows: Optional[List[np.ndarray]] = field(default=None, repr=False, compare=False)
+
+    is_sparse = True
+
+    # -------------------------
+    # Construction
+    # -------------------------
+    @classmethod
+    def from_coo(cls, n_voters: int, offsets, voters, cols) -> "SparseMultiIssueElection":
+        """Build from (voter, column) approval pairs; duplicates are merged."""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        total = int(offsets[-1])
+        voters = np.asarray(voters, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        if len(voters) and (voters.min() < 0 or voters.max() >= n_voters or cols.min() < 0 or cols.max() >= total):
+            raise ValueError("approval coordinates out of range")
+        key = np.unique(cols * n_voters + voters)
+        cols, voters = np.divmod(key, n_voters)
+        indptr = np.zeros(total + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=total), out=indptr[1:])
+        return cls(n_voters=n_voters, offsets=offsets, indptr=indptr, indices=voters)
+
+    @classmethod
+    def from_dense(cls, elec: MultiIssueElection) -> "SparseMultiIssueElection":
+        voters, cols = np.nonzero(np.asarray(elec.columns) == 1)
+        return cls.from_coo(elec.n_voters, elec.column_offsets, voters, cols)
+
+    def to_dense(self) -> MultiIssueElection:
+        columns = np.zeros((self.n_voters, int(self.offsets[-1])), dtype=np.int64)
+        cols = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        columns[self.indices, cols] = 1
+        counts = np.diff(self.offsets)
+        return MultiIssueElection.from_issues(np.split(columns, np.cumsum(counts)[:-1], axis=1))
+
+    # -------------------------
+    # Shape
+    # -------------------------
+    @property
+    def n_issues(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_approvals(self) -> int:
+        return len(self.indices)
+
+    @property
+    def candidate_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def candidates_per_issue(self) -> int:
+        """Largest number of candidates of an issue."""
+        return int(self.candidate_counts.max())
+
+    @property
+    def column_offsets(self) -> np.ndarray:
+        return self.offsets
+
+    @property
+    def shape_key(self) -> tuple:
+        return (self.n_voters, self.n_issues, tuple(int(m) for m in self.candidate_counts))
+
+    # -------------------------
+    # Access
+    # -------------------------
+    def column(self, issue: int, cand: int) -> int:
+        return int(self.offsets[issue] + cand)
+
+    def column_voters(self, col: int) -> np.ndarray:
+        """Voters approving column `col` (ascending)."""
+        return self.indices[self.indptr[col]:self.indptr[col + 1]]
+
+    def column_counts(self) -> np.ndarray:
+        """Number of approvals of every column."""
+        return np.diff(self.indptr)
+
+    def _voter_columns(self) -> List[np.ndarray]:
+        # Row view (CSR), built on first use
+        if self._rows is None:
+            cols = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            bounds = np.searchsorted(self.indices[order], np.arange(self.n_voters + 1))
+            self._rows = [cols[order[bounds[v]:bounds[v + 1]]] for v in range(self.n_voters)]
+        return self._rows
+
+    def voter_columns(self, voter: int) -> np.ndarray:
+        """Columns approved by `voter` (ascending)."""
+        return self._voter_columns()[voter]
+
+    def voter_row(self, voter: int) -> np.ndarray:
+        """Dense 0/1 row of `voter` over all candidate columns."""
+        row = np.zeros(int(self.offsets[-1]), dtype=np.int64)
+        row[self.voter_columns(voter)] = 1
+        return row
+
+    def approves(self, voter: int, issue: int, cand: int) -> bool:
+        voters = self.column_voters(self.column(issue, cand))
+        pos = np.searchsorted(voters, voter)
+        return bool(pos < len(voters) and voters[pos] == voter)
+
+    def ballot_keys(self) -> List[bytes]:
+        """Hashable key of every voter's ballot (equal keys = identical ballots)."""
+        return [cols.astype(np.int64).tobytes() for cols in self._voter_columns()]
+
+    # -------------------------
+    # Manipulation
+    # -------------------------
+    def copy(self) -> "SparseMultiIssueElection":
+        return SparseMultiIssueElection(
+            n_voters=self.n_voters, offsets=self.offsets.copy(),
+            indptr=self.indptr.copy(), indices=self.indices.copy(),
+        )
+
+    def drop_approvals(self, voters, issue: int, cand: int) -> "SparseMultiIssueElection":
+        """Copy of the election where `voters` no longer approve `cand` on `issue`."""
+        col = self.column(issue, cand)
+        start, end = self.indptr[col], self.indptr[col + 1]
+        segment = self.indices[start:end]
+        keep = ~np.isin(segment, np.atleast_1d(voters))
+        removed = len(segment) - int(keep.sum())
+        if removed == 0:
+            return self.copy()
+        indices = np.concatenate([self.indices[:start], segment[keep], self.indices[end:]])
+        indptr = self.indptr.copy()
+        indptr[col + 1:] -= removed
+        return SparseMultiIssueElection(
+            n_voters=self.n_voters, offsets=self.offsets.copy(), indptr=indptr, indices=indices,
+        )
+
+
+def to_sparse(elec) -> SparseMultiIssueElection:
+    """Sparse version of an election (returned unchanged if already sparse)."""
+    if getattr(elec, "is_sparse", False):
+        return elec
+    return SparseMultiIssueElection.from_dense(elec)
+
+
+def issue_columns(elec: SparseMultiIssueElection, issue: int) -> Dict[str, np.ndarray]:
+    """
+    Approvals of one issue in coordinate form:
+      voters : approving voter of every approval
+      cands  : candidate (local index within the issue) of every approval
+    Approvals are grouped by candidate, voters ascending within a candidate.
+    """
+    c0, c1 = elec.offsets[issue], elec.offsets[issue + 1]
+    start, end = elec.indptr[c0], elec.indptr[c1]
+    counts = np.diff(elec.indptr[c0:c1 + 1])
+    return {
+        "voters": elec.indices[start:end],
+        "cands": np.repeat(np.arange(c1 - c0), counts),
+        "counts": counts,
+    }
@@ -1,6 +1,6 @@
 # File: core/types.py
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 import numpy as np
 
 
@@ -9,13 +9,54 @@ class MultiIssueElection:
     """
     Represents a multi-issue approval election.
 
+    Two layouts are supported:
+
+    • dense  (offsets is None): approvals has shape (n_voters, n_issues, n_candidates);
+      approvals[v, i, c] = 1 if voter v approves candidate c on issue i.
+    • ragged (offsets given):   approvals has shape (n_voters, total_candidates) with the
+      candidate columns of all issues concatenated; issue i owns the columns
+      offsets[i]:offsets[i+1], so issues may have different numbers of candidates.
+
+    Code that must handle both layouts uses `issue(i)`, `columns`, `column(i, c)`
+    and `candidate_counts` instead of indexing `approvals` directly.
+
     Attributes
     ----------
     approvals : np.ndarray
-        Binary approval tensor of shape (n_voters, n_issues, n_candidates).
-        approvals[v, i, c] = 1 if voter v approves candidate c on issue i.
+        Binary approval tensor (see layouts above).
+    offsets : np.ndarray, optional
+        Column offsets of the issues, length n_issues + 1 (ragged layout only).
     """
     approvals: np.ndarray
+    offsets: Optional[np.ndarray] = None
+
+    is_sparse = False  # see core.sparse.SparseMultiIssueElection
+
+    def __post_init__(self):
+        if self.offsets is None:
+            return
+        self.offsets = np.asarray(self.offsets, dtype=np.int64)
+        if self.approvals.ndim != 2:
+            raise ValueError("ragged approvals must have shape (n_voters, total_candidates)")
+        if (self.offsets[0] != 0 or self.offsets[-1] != self.approvals.shape[1]
+                or np.any(np.diff(self.offsets) < 1)):
+            raise ValueError("offsets must increase from 0 to the number of candidate columns")
+
+    @classmethod
+    def from_issues(cls, issue_matrices: List[np.ndarray]) -> "MultiIssueElection":
+        """
+        Build an election from one (n_voters, m_i) matrix per issue.
+        Uses the dense layout when all issues have the same number of candidates.
+        """
+        counts = [m.shape[1] for m in issue_matrices]
+        if len(set(counts)) <= 1:
+            return cls(np.stack(issue_matrices, axis=1))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(np.concatenate(issue_matrices, axis=1), offsets)
+
+    @property
+    def is_ragged(self) -> bool:
+        return self.offsets is not None
 
     @property
     def n_voters(self) -> int:
@@ -23,12 +64,72 @@ class MultiIssueElection:
 
     @property
     def n_issues(self) -> int:
+        if self.is_ragged:
+            return len(self.offsets) - 1
         return self.approvals.shape[1]
 
     @property
     def candidates_per_issue(self) -> int:
+        """Number of candidates per issue (the largest one for ragged layouts)."""
+        if self.is_ragged:
+            return int(self.candidate_counts.max())
         return self.approvals.shape[2]
 
+    @property
+    def candidate_counts(self) -> np.ndarray:
+        """Number of candidates of every issue, shape (n_issues,)."""
+        if self.is_ragged:
+            return np.diff(self.offsets)
+        return np.full(self.n_issues, self.approvals.shape[2])
+
+    @property
+    def column_offsets(self) -> np.ndarray:
+        """First column of every issue in `columns`, plus the total; length n_issues + 1."""
+        if self.is_ragged:
+            return self.offsets
+        return np.arange(self.n_issues + 1) * self.approvals.shape[2]
+
+    @property
+    def columns(self) -> np.ndarray:
+        """Approvals as (n_voters, total_candidates); a view for both layouts."""
+        if self.is_ragged:
+            return self.approvals
+        return self.approvals.reshape(self.n_voters, -1)
+
+    @property
+    def shape_key(self) -> tuple:
+        """Hashable description of the shape (used to cache per-shape tables)."""
+        if self.is_ragged:
+            return (self.n_voters, self.n_issues, tuple(int(m) for m in self.candidate_counts))
+        return self.approvals.shape
+
+    def issue(self, i: int) -> np.ndarray:
+        """Approvals on issue i, shape (n_voters, m_i)."""
+        if self.is_ragged:
+            return self.approvals[:, self.offsets[i]:self.offsets[i + 1]]
+        return self.approvals[:, i, :]
+
+    def column(self, issue: int, cand: int) -> int:
+        """Index of candidate `cand` of `issue` in `columns`."""
+        return int(self.column_offsets[issue] + cand)
+
+    def voter_row(self, voter: int) -> np.ndarray:
+        """Ballot of `voter` over all candidate columns."""
+        return self.columns[voter]
+
+    def approves(self, voter: int, issue: int, cand: int) -> bool:
+        return bool(self.columns[voter, self.column(issue, cand)] == 1)
+
+    def copy(self) -> "MultiIssueElection":
+        offsets = None if self.offsets is None else self.offsets.copy()
+        return MultiIssueElection(np.array(self.approvals, copy=True), offsets)
+
+    def drop_approvals(self, voters, issue: int, cand: int) -> "MultiIssueElection":
+        """Copy of the election where `voters` no longer approve `cand` on `issue`."""
+        new = self.copy()
+        new.columns[voters, new.column(issue, cand)] = 0
+        return new
+
 
 @dataclass
 class Outcome:
@@ -55,32 +156,85 @@ def make_outcome(winners: List[int]) -> Outcome:
 # Welfare Functions
 # -------------------------
 
+def _gather(elec: MultiIssueElection, winners) -> np.ndarray:
+    """Approvals of every voter for the winners of a batch of outcomes: (n_voters, B, n_issues)."""
+    winners = np.atleast_2d(np.asarray(winners, dtype=np.int64))
+    cols = elec.column_offsets[:-1][None, :] + winners
+    # int64 so that compact approval dtypes (e.g. int8 loaded data) sum and log exactly
+    return elec.columns[:, cols].astype(np.int64)
+
+
+def _sparse_utilities(elec, winners) -> np.ndarray:
+    """(n_voters, B) utilities for a sparse election, touching only the winners' approvals."""
+    winners = np.atleast_2d(np.asarray(winners, dtype=np.int64))
+    cols = elec.column_offsets[:-1][None, :] + winners
+    utils = np.zeros((elec.n_voters, len(winners)), dtype=np.int64)
+    for b, row in enumerate(cols):
+        for col in row:
+            utils[elec.column_voters(col), b] += 1
+    return utils
+
+
+def batch_utilities(elec: MultiIssueElection, winners) -> np.ndarray:
+    """
+    Per-voter utilities (approved winners) for a batch of outcomes.
+
+    Parameters
+    ----------
+    elec : MultiIssueElection
+    winners : array-like of shape (B, n_issues)
+        One outcome per row.
+
+    Returns
+    -------
+    np.ndarray of shape (B, n_voters).
+    """
+    if elec.is_sparse:
+        return _sparse_utilities(elec, winners).T
+    return _gather(elec, winners).sum(axis=2).T
+
+
+def batch_welfare(elec: MultiIssueElection, winners) -> dict:
+    """
+    Utilitarian, egalitarian and Nash welfare of a batch of outcomes in one pass.
+
+    `winners` has shape (B, n_issues); every returned array has shape (B,).
+    Nash welfare is evaluated in log-space, so it does not overflow for large
+    electorates.
+    """
+    if elec.is_sparse:
+        utils = _sparse_utilities(elec, winners)           # (n_voters, B)
+        log_nash = np.log(2.0) * utils.mean(axis=0)        # binary approvals: prod_i (1 + a_vi) = 2^u
+    else:
+        gathered = _gather(elec, winners)                  # (n_voters, B, n_issues)
+        utils = gathered.sum(axis=2)                       # (n_voters, B)
+        # log of prod_i (1 + a_vi), averaged over voters = log of the geometric mean
+        log_nash = np.log1p(gathered).sum(axis=2).mean(axis=0)
+    return {
+        "utilitarian": utils.sum(axis=0).astype(float),
+        "egalitarian": utils.min(axis=0).astype(float),
+        "nash": np.exp(log_nash),
+    }
+
+
 def utilitarian_welfare(elec: MultiIssueElection, outcome: Outcome) -> float:
     """
     Sum of approvals (total utility) across all voters and issues.
     """
-    welfare = 0.0
-    for issue, cand in enumerate(outcome.winners):
-        welfare += elec.approvals[:, issue, cand].sum()
-    return welfare
+    return float(batch_welfare(elec, [outcome.winners])["utilitarian"][0])
 
 
 def egalitarian_welfare(elec: MultiIssueElection, outcome: Outcome) -> float:
     """
     Minimum utility across voters (focus on worst-off voter).
     """
-    scores = np.zeros(elec.n_voters)
-    for issue, cand in enumerate(outcome.winners):
-        scores += elec.approvals[:, issue, cand]
-    return scores.min()
+    return float(batch_welfare(elec, [outcome.winners])["egalitarian"][0])
 
 
 def nash_welfare(elec: MultiIssueElection, outcome: Outcome) -> float:
     """
     Nash social welfare: geometric mean of utilities.
     To avoid zero-product, we add +1 to each voter’s score.
+    Computed in log-space to avoid overflow for large n.
     """
-    scores = np.ones(elec.n_voters)
-    for issue, cand in enumerate(outcome.winners):
-        scores *= (1 + elec.approvals[:, issue, cand])
-    return np.prod(scores) ** (1 / elec.n_voters)
+    return float(batch_welfare(elec, [outcome.winners])["nash"][0])
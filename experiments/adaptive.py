@@ -0,0 +1,321 @@
+# File: experiments/adaptive.py
+# Adaptive sweeps: risk curves over one culture parameter (p, phi or
+# noise_prob) refined where they need it.
+#
+# Every (culture, rule) curve starts on a coarse grid. For each interval the
+# change of mean risk between its end points (risk by default; any metric of
+# the detector can drive the refinement) is tested against the 95% CI of that
+# difference, Z * sqrt(se_a^2 + se_b^2): a significant change lets the interval
+# be split at its midpoint, otherwise its noisier end point can get twice the
+# seeds. Steps are taken in order of interval width × change (or CI) per
+# expected rule evaluation, across all curves, until the budget is spent.
+# Flat regions keep their coarse points (with more seeds, up to max_seeds) and
+# transitions get dense ones; a bump entirely inside an interval whose ends
+# agree goes unnoticed. Standard errors are floored (`se_floor`), so that a
+# point whose few seeds happen to agree does not count as exact and make
+# sampling noise next to it look like a transition.
+#
+# Points use seeds 0..s-1 like the regular sweep, and the result is written in
+# the sweep-store schema (one row per parameter point), so it can share a store
+# with `sweep` and feeds `cube` / `plot_results` directly.
+#
+#   python -m experiments.run_experiments adaptive --param p --range 0.05 0.95 --cultures p_ic --rules thiele_x1 owa_x1 --budget 200000
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from experiments import worker
+from experiments.registry import CULTURES, rule_fits, rule_names
+from experiments.sweep import (
+    CULTURE_PARAMS, DEFAULTS, INT_PARAMS, SweepCell,
+    _cell_from_row, _to_store_frame, load_store,
+)
+
+ADAPTIVE_PARAMS = ["p", "phi", "noise_prob"]
+RATE_METRICS = {"success_rate", "harm_rate", "risk"}
+Z_95 = 1.96
+
+
+def se_floor(mean: float, n: int, rate: bool) -> float:
+    """
+    Smallest standard error credited to a mean over n seeds. A few seeds that
+    happen to agree (e.g. all 0) say little about the spread, so rates get the
+    Wilson bound of n Bernoulli trials with that mean, and counts that of a
+    Poisson count (at least 1 per seed).
+    """
+    if not rate:
+        return math.sqrt(max(abs(mean), 1.0) / n)
+    z2 = Z_95 ** 2
+    centre = (n * min(max(mean, 0.0), 1.0) + z2 / 2) / (n + z2)
+    return math.sqrt(centre * (1 - centre) / (n + z2))
+
+
+def evaluation_cost(rows: List[Dict]) -> int:
+    """
+    Rule evaluations spent on per-seed rows: the outcome itself, the baseline of
+    the detector and one re-run per eligible manipulation.
+    """
+    return sum(2 + int(r["eligible"]) for r in rows)
+
+
+def _evaluate(cell: SweepCell, seeds: range) -> List[Dict]:
+    kwargs = {k: v for k, v in asdict(cell).items() if v is not None}
+    return [
+        worker.run_seed(seed=s, **kwargs)
+        for s in seeds
+    ]
+
+
+@dataclass(eq=False)
+class Curve:
+    """Per-seed rows of every evaluated point of one (culture, rule) curve."""
+    base: SweepCell
+    param: str
+    metric: str = "risk"
+    points: Dict[float, List[Dict]] = field(default_factory=dict)
+
+    def cell(self, value: float) -> SweepCell:
+        return replace(self.base, **{self.param: value})
+
+    def mean_se(self, value: float) -> Tuple[float, float]:
+        """Mean of the curve's metric and its standard error (at least `se_floor`) at a point."""
+        risks = np.array([r[self.metric] for r in self.points[value]], dtype=float)
+        n, mean = len(risks), float(risks.mean())
+        if n < 2:
+            return mean, math.inf
+        se = float(risks.std(ddof=1)) / math.sqrt(n)
+        return mean, max(se, se_floor(mean, n, self.metric in RATE_METRICS))
+
+    def stats(self, value: float) -> Tuple[float, float]:
+        """Mean of the curve's metric and its 95% CI half-width at a point."""
+        mean, se = self.mean_se(value)
+        return mean, Z_95 * se
+
+    def cost_per_seed(self, value: float) -> float:
+        rows = self.points[value]
+        return evaluation_cost(rows) / len(rows)
+
+    def candidates(self, min_width: float, seeds: int, max_seeds: int) -> List[Tuple[float, str, float, Optional[float]]]:
+        """
+        Possible refinement steps as (priority, action, value, other end):
+        ('split', a, b) bisects [a, b]; ('seeds', v, None) doubles the seeds at v.
+
+        An interval is split when the change between its ends exceeds the 95%
+        CI of the difference, Z_95 * sqrt(se_a² + se_b²); otherwise its noisier
+        end below max_seeds gets more seeds, and once both ends have max_seeds
+        the interval is left as it is. The priority is the area the interval can
+        misrepresent per rule evaluation spent on it: width × |change| for a
+        split (a jump inside stays large after bisection, a flat stretch drops
+        out), width × CI for more seeds, divided by the expected cost of the
+        step.
+        """
+        values = sorted(self.points)
+        stats = {v: self.mean_se(v) for v in values}
+        steps = []
+        for a, b in zip(values, values[1:]):
+            (ma, sa), (mb, sb) = stats[a], stats[b]
+            change, ci = abs(mb - ma), Z_95 * math.hypot(sa, sb)
+            if change > ci:
+                if b - a > min_width:
+                    cost = seeds * (self.cost_per_seed(a) + self.cost_per_seed(b)) / 2
+                    steps.append(((b - a) * change / cost, "split", a, b))
+                continue
+            open_ends = [(s, v) for s, v in ((sa, a), (sb, b)) if len(self.points[v]) < max_seeds]
+            if open_ends:
+                noisy = max(open_ends)[1]
+                cost = len(self.points[noisy]) * self.cost_per_seed(noisy)
+                steps.append(((b - a) * ci / cost, "seeds", noisy, None))
+        return steps
+
+    def summary_rows(self) -> List[Dict]:
+        rows = []
+        for value in sorted(self.points):
+            row = worker.summarize_rows(self.points[value])
+            row[f"{self.metric}_ci"] = self.stats(value)[1]
+            row.update(asdict(self.cell(value)))
+            rows.append(row)
+        return rows
+
+
+def _run_jobs(jobs: List[Tuple[SweepCell, range]], pool: Optional[ProcessPoolExecutor]) -> List[List[Dict]]:
+    if pool is None:
+        return [_evaluate(cell, seeds) for cell, seeds in jobs]
+    return list(pool.map(_evaluate, *zip(*jobs))) if jobs else []
+
+
+def adaptive_sweep(
+    cultures: List[str],
+    rules: Optional[List[str]],
+    param: str,
+    lo: float,
+    hi: float,
+    budget: int,
+    fixed: Optional[Dict] = None,
+    init_points: int = 5,
+    seeds: int = 10,
+    max_seeds: int = 160,
+    min_width: Optional[float] = None,
+    workers: int = 1,
+    metric: str = "risk",
+) -> pd.DataFrame:
+    """
+    Refine risk curves over `param` in [lo, hi] within `budget` rule evaluations.
+
+    Parameters
+    ----------
+    cultures, rules : curves to build (any registry rules; default: the experiments' rules
+                      for n_voters; owa_x<x> with x > n_voters-1 is skipped)
+    param : one of p, phi, noise_prob; must be a parameter of every culture
+    fixed : values of the other sweep parameters (defaults as in `sweep`)
+    init_points : size of the initial uniform grid
+    seeds : seeds of a new point
+    max_seeds : seeds a point may be raised to while its interval's change is not significant
+    min_width : intervals narrower than this are not split (default (hi-lo)/256)
+    workers : evaluate up to this many steps per round in parallel
+    metric : metric whose curve drives the refinement (default risk)
+
+    Returns
+    -------
+    pd.DataFrame in the sweep-store schema, plus the column `<metric>_ci`.
+    The initial grid is always evaluated; refinement stops before a step
+    whose expected cost would exceed the remaining budget.
+    """
+    if param not in ADAPTIVE_PARAMS:
+        raise ValueError(f"Adaptive sweeps run over {ADAPTIVE_PARAMS}, not {param!r}")
+    if metric not in worker.METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if not lo < hi or init_points < 2:
+        raise ValueError("Need lo < hi and at least 2 initial points")
+    for culture in cultures:
+        if culture not in CULTURES:
+            raise ValueError(f"Unknown culture: {culture}")
+        if param not in CULTURE_PARAMS[culture]:
+            raise ValueError(f"Culture {culture!r} does not depend on {param!r}")
+
+    point = {**DEFAULTS, **(fixed or {})}
+    if rules is None:
+        rules = rule_names(point["n_voters"])
+    else:
+        rules = [r for r in rules if rule_fits(r, point["n_voters"])]
+    min_width = (hi - lo) / 256 if min_width is None else min_width
+
+    curves = []
+    for culture in cultures:
+        relevant = CULTURE_PARAMS[culture]
+        params = {k: (v if k in relevant else None) for k, v in point.items()}
+        for rule in rules:
+            curves.append(Curve(SweepCell(culture=culture, rule=rule, **params), param, metric))
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    spent = 0
+    try:
+        grid = [round(float(v), 10) for v in np.linspace(lo, hi, init_points)]
+        targets = [(c, v) for c in curves for v in grid]
+        jobs = [(c.cell(v), range(seeds)) for c, v in targets]
+        for (curve, value), rows in zip(targets, _run_jobs(jobs, pool)):
+            curve.points[value] = rows
+            spent += evaluation_cost(rows)
+        cost_per_seed = spent / (len(jobs) * seeds)
+
+        while True:
+            steps = sorted(
+                ((prio, curve, action, a, b) for curve in curves
+                 for prio, action, a, b in curve.candidates(min_width, seeds, max_seeds)),
+                key=lambda step: step[0], reverse=True,
+            )
+            round_jobs, targets, expected = [], [], 0.0
+            for prio, curve, action, a, b in steps:
+                if len(round_jobs) == workers:
+                    break
+                if action == "split":
+                    value = round((a + b) / 2, 10)
+                    new_seeds = range(seeds)
+                else:
+                    value = a
+                    have = len(curve.points[a])
+                    new_seeds = range(have, min(2 * have, max_seeds))
+                if any(c is curve and v == value for c, v in targets):
+                    continue  # the same point may be the noisy end of two intervals
+                cost = cost_per_seed * len(new_seeds)
+                if spent + expected + cost > budget:
+                    break
+                expected += cost
+                round_jobs.append((curve.cell(value), new_seeds))
+                targets.append((curve, value))
+            if not round_jobs:
+                break
+            for (curve, value), rows in zip(targets, _run_jobs(round_jobs, pool)):
+                curve.points.setdefault(value, []).extend(rows)
+                spent += evaluation_cost(rows)
+            n_seeds = sum(len(rows) for c in curves for rows in c.points.values())
+            cost_per_seed = spent / n_seeds
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print(f"Adaptive sweep: {spent} rule evaluations, "
+          f"{sum(len(c.points) for c in curves)} points over {len(curves)} curve(s)")
+    return _to_store_frame([row for c in curves for row in c.summary_rows()])
+
+
+def save_to_store(path: str, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Merge rows into the sweep store at `path`, replacing rows with the same index."""
+    rows = fresh.to_dict("records")
+    if os.path.exists(path):
+        keys = {_cell_from_row(r).key() for r in rows}
+        rows = [r for r in load_store(path).to_dict("records") if _cell_from_row(r).key() not in keys] + rows
+    merged = _to_store_frame(rows)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    merged.to_csv(path, index=False)
+    print(f"Saved adaptive sweep results to {path}")
+    return merged
+
+
+# =====================
+# CLI ENTRYPOINT
+# =====================
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="run_experiments adaptive",
+        description="Adaptively refined risk curves over one culture parameter.",
+    )
+    parser.add_argument("--param", choices=ADAPTIVE_PARAMS, required=True)
+    parser.add_argument("--range", nargs=2, type=float, default=[0.0, 1.0], metavar=("LO", "HI"))
+    parser.add_argument("--cultures", nargs="+", choices=CULTURES, default=["p_ic"])
+    parser.add_argument("--rules", nargs="+", help="rule names (default: all)")
+    parser.add_argument(
+        "--fix", action="append", default=[], metavar="NAME=VALUE",
+        help="value of another sweep parameter, e.g. n_voters=20 (repeatable)",
+    )
+    parser.add_argument("--budget", type=int, required=True, help="total rule evaluations")
+    parser.add_argument("--init", type=int, default=5, help="initial grid points")
+    parser.add_argument("--seeds", type=int, default=10, help="seeds of a new point")
+    parser.add_argument("--max_seeds", type=int, default=160)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--metric", default="risk", help="metric whose curve is refined")
+    parser.add_argument("--out", default="results/sweep.csv")
+    args = parser.parse_args(argv)
+
+    fixed = {}
+    for item in args.fix:
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULTS or name == args.param or not value:
+            parser.error(f"--fix expects NAME=VALUE for a sweep parameter other than {args.param}; got {item!r}")
+        fixed[name] = int(value) if name in INT_PARAMS else float(value)
+
+    store = adaptive_sweep(
+        args.cultures, args.rules, args.param, args.range[0], args.range[1], args.budget,
+        fixed=fixed, init_points=args.init, seeds=args.seeds, max_seeds=args.max_seeds,
+        workers=args.workers, metric=args.metric,
+    )
+    return save_to_store(args.out, store)
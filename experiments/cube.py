@@ -0,0 +1,169 @@
+# File: experiments/cube.py
+# Summary cube: metrics pre-aggregated per (culture, rule family, parameter,
+# sweep parameters), so that plots and tables never touch the per-seed rows.
+#
+# Any of the result files can be the input — per-seed rows (batch `--csv` of a
+# single culture/rule, shard outputs), combined summaries or sweep stores. Rows
+# that are already summaries carry a `seeds` column and are weighted by it, so
+# every cube entry is the mean over all seeds it covers. Inputs are read in
+# chunks and folded into running sums, so the cost of building the cube grows
+# with the number of rows but its memory does not.
+#
+#   python -m experiments.run_experiments cube results/combined.csv --out results/cube.csv --latex report/tables/combined.tex
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from experiments.sweep import SWEEP_PARAMS
+from experiments.worker import METRICS
+
+KEY_COLUMNS = ["culture", "family", "param", "rule"] + SWEEP_PARAMS
+DEFAULT_CUBE = "results/cube.csv"
+
+
+def rule_family(rules: pd.Series) -> pd.DataFrame:
+    """
+    Family and parameter of every rule name ('thiele_x5' -> thiele, 5).
+    Rules without a parameter are their own family with an empty parameter.
+    """
+    parts = rules.str.extract(r"^(thiele|owa)_x(\d+)$")
+    return pd.DataFrame({
+        "family": parts[0].fillna(rules),
+        "param": pd.to_numeric(parts[1]).astype("Int64"),
+    }, index=rules.index)
+
+
+def add_risk_column(df: pd.DataFrame) -> pd.DataFrame:
+    """Add 'risk' column if missing (harms/successes)."""
+    if "risk" not in df.columns and "successes" in df.columns and "harms" in df.columns:
+        df = df.copy()
+        successes = df["successes"].to_numpy(dtype=float)
+        harms = df["harms"].to_numpy(dtype=float)
+        df["risk"] = np.divide(harms, successes, out=np.zeros_like(harms), where=successes > 0)
+    return df
+
+
+def _partial(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Seed-weighted metric sums of one chunk, grouped by the cube keys."""
+    chunk = add_risk_column(chunk)
+    weights = chunk["seeds"].astype(float) if "seeds" in chunk.columns else pd.Series(1.0, index=chunk.index)
+    keys = pd.concat([chunk[["culture", "rule"]], rule_family(chunk["rule"])], axis=1)
+    for c in SWEEP_PARAMS:
+        keys[c] = chunk[c] if c in chunk.columns else np.nan
+    sums = pd.DataFrame({m: chunk[m].astype(float) * weights for m in METRICS if m in chunk.columns})
+    sums["seeds"] = weights
+    return pd.concat([keys[KEY_COLUMNS], sums], axis=1).groupby(KEY_COLUMNS, dropna=False, sort=False).sum()
+
+
+def _means(sums: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Turn seed-weighted sums indexed by `keys` into per-key seeds and means."""
+    cube = sums.groupby(level=keys, dropna=False, sort=False).sum()
+    metrics = [m for m in METRICS if m in cube.columns]
+    cube[metrics] = cube[metrics].div(cube["seeds"], axis=0)
+    cube["seeds"] = cube["seeds"].round().astype(int)
+    return cube.reset_index()[keys + ["seeds"] + metrics]
+
+
+def build_cube(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Aggregate result rows into the cube: one row per distinct key with the
+    number of seeds and the seed-weighted mean of every metric. Keys keep the
+    order in which they first appear.
+    """
+    partials = [_partial(f) for f in frames if len(f)]
+    if not partials:
+        return pd.DataFrame(columns=KEY_COLUMNS + ["seeds"] + METRICS)
+    return _means(pd.concat(partials), KEY_COLUMNS)
+
+
+def build_cube_from_files(paths: Sequence[str], chunksize: int = 200_000) -> pd.DataFrame:
+    """`build_cube` over CSV result files, reading `chunksize` rows at a time."""
+    def chunks():
+        for path in paths:
+            yield from pd.read_csv(path, chunksize=chunksize)
+    return build_cube(chunks())
+
+
+def load_cube(path: str = DEFAULT_CUBE) -> pd.DataFrame:
+    cube = pd.read_csv(path)
+    cube["param"] = cube["param"].astype("Int64")
+    return cube
+
+
+def rollup(cube: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Seed-weighted means of the cube over coarser `keys` (e.g. culture, family, param)."""
+    metrics = [m for m in METRICS if m in cube.columns]
+    weights = cube["seeds"].astype(float)
+    sums = cube[metrics].mul(weights, axis=0)
+    sums["seeds"] = weights
+    grouped = pd.concat([cube[keys], sums], axis=1).groupby(keys, dropna=False, sort=False).sum()
+    return _means(grouped, keys)
+
+
+def slices(cube: pd.DataFrame, keys: List[str]) -> Iterator[Tuple[Dict, pd.DataFrame]]:
+    """
+    Cube rows per distinct value of `keys`, as ({key: value}, rows); keys that
+    are missing (parameters a culture does not have) are left out of the dict.
+    Unlike `rollup` nothing is averaged, so grouping by the sweep parameters
+    keeps sweep points apart.
+    """
+    for values, rows in cube.groupby(keys, dropna=False, sort=False):
+        yield {k: v for k, v in zip(keys, values) if not pd.isna(v)}, rows
+
+
+def sweep_label(cube: pd.DataFrame, point: Dict) -> str:
+    """
+    File-name label of a slice, e.g. 'n_voters20_p0.3': the sweep parameters of
+    `point` that take more than one value among the cube rows of its culture.
+    Empty when the culture holds a single sweep point (e.g. a `--batch all`
+    summary, which has no sweep columns at all).
+    """
+    rows = cube[cube["culture"] == point["culture"]]
+    return "_".join(
+        f"{k}{float(v):g}" for k, v in point.items()
+        if k in SWEEP_PARAMS and rows[k].nunique(dropna=False) > 1
+    )
+
+
+def curves(cube: pd.DataFrame, param: str) -> Iterator[Tuple[Dict, pd.DataFrame]]:
+    """
+    Cube rows along the sweep parameter `param`: one slice per culture and
+    values of the other sweep parameters in which `param` takes at least two
+    values, with its rows sorted by `param`.
+    """
+    fixed = ["culture"] + [c for c in SWEEP_PARAMS if c != param]
+    for point, rows in slices(cube[cube[param].notna()], fixed):
+        if rows[param].nunique() >= 2:
+            yield point, rows.sort_values(param, kind="stable")
+
+
+def summary_table(cube: pd.DataFrame) -> pd.DataFrame:
+    """Per culture × rule table with the columns of the combined run summary."""
+    return rollup(cube, ["culture", "rule"])
+
+
+def cube_main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="run_experiments cube",
+        description="Pre-aggregate result files into the summary cube read by plots and tables.",
+    )
+    parser.add_argument("paths", nargs="+", help="result CSVs (per-seed rows, combined summaries or sweep stores)")
+    parser.add_argument("--out", type=str, default=DEFAULT_CUBE)
+    parser.add_argument("--latex", type=str, default=None, help="also write the culture × rule LaTeX table")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    cube = build_cube_from_files(args.paths, chunksize=args.chunksize)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    cube.to_csv(args.out, index=False)
+    print(f"Saved cube ({len(cube)} rows) to {args.out}")
+    if args.latex:
+        from experiments.run_experiments import df_to_latex_table
+        df_to_latex_table(summary_table(cube), args.latex)
+    return cube
@@ -1,61 +1,45 @@
 # File: experiments/plot_results.py
+# Plots read the summary cube (experiments/cube.py), never the per-seed rows.
+# Cube rows of different sweep points (n_voters, p, phi, ...) are never
+# averaged together: every figure shows one sweep point.
+import argparse
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
 
-
-def add_risk_column(df: pd.DataFrame) -> pd.DataFrame:
-    """Add 'risk' column if missing (harms/successes)."""
-    if "risk" not in df.columns and "successes" in df.columns and "harms" in df.columns:
-        df = df.copy()
-        df["risk"] = df.apply(
-            lambda row: row["harms"] / row["successes"] if row["successes"] > 0 else 0.0,
-            axis=1,
-        )
-    return df
+from experiments.cube import DEFAULT_CUBE, build_cube_from_files, curves, load_cube, slices, sweep_label
+from experiments.sweep import SWEEP_PARAMS
 
 
-def extract_family_and_param(rule: str):
-    """Extract family ('thiele' or 'owa') and parameter value (int)."""
-    if rule.startswith("thiele_x"):
-        return "thiele", int(rule.split("x")[1])
-    if rule.startswith("owa_x"):
-        return "owa", int(rule.split("x")[1])
-    return rule, None
+def _suffix(label: str, sep: str) -> str:
+    return f"{sep}{label}" if label else ""
 
 
-def plot_risk_by_family(df: pd.DataFrame, out_dir: str):
+def plot_risk_by_family(cube: pd.DataFrame, out_dir: str):
     """
-    Generate risk plots per culture × family.
-    Metrics: success_rate, harm_rate, risk.
+    Generate risk plots per culture × sweep point × family from the summary cube.
+    Metrics: success_rate, harm_rate, risk. Files are named
+    risk_<culture>_<family>.pdf, followed by `_<sweep label>` only when the
+    culture holds several sweep points.
     """
-    df = add_risk_column(df)
     metrics = ["success_rate", "harm_rate", "risk"]
 
     os.makedirs(out_dir, exist_ok=True)
 
-    # --- Plot per culture and rule family ---
-    for culture in df["culture"].unique():
-        subset_culture = df[df["culture"] == culture]
+    # --- Plot per culture, sweep point and rule family ---
+    for point, rows in slices(cube, ["culture"] + SWEEP_PARAMS):
+        culture, label = point["culture"], sweep_label(cube, point)
 
         for family in ["thiele", "owa"]:
-            subset_family = []
-            for _, row in subset_culture.iterrows():
-                fam, param = extract_family_and_param(row["rule"])
-                if fam == family:
-                    new_row = row.copy()
-                    new_row["param"] = param
-                    subset_family.append(new_row)
-
-            if not subset_family:
+            fam_df = rows[rows["family"] == family].sort_values("param")
+            if fam_df.empty:
                 continue
 
-            fam_df = pd.DataFrame(subset_family).sort_values("param")
             fig, ax = plt.subplots(figsize=(8, 5))
 
             for metric, style, color in zip(metrics, ["-", "--", "-."], ["tab:blue", "tab:orange", "tab:green"]):
                 ax.plot(
-                    fam_df["param"],
+                    fam_df["param"].astype(int),
                     fam_df[metric],
                     style,
                     marker="o",
@@ -63,14 +47,14 @@ def plot_risk_by_family(df: pd.DataFrame, out_dir: str):
                     color=color,
                 )
 
-            ax.set_title(f"Manipulation Risk – {culture} ({family})")
+            ax.set_title(f"Manipulation Risk – {culture} ({family}){_suffix(label, ', ')}")
             ax.set_xlabel("Parameter x")
             ax.set_ylabel("Rate")
             ax.legend()
             ax.grid(alpha=0.3)
             plt.tight_layout()
 
-            out_file = os.path.join(out_dir, f"risk_{culture}_{family}.pdf")
+            out_file = os.path.join(out_dir, f"risk_{culture}_{family}{_suffix(label, '_')}.pdf")
             plt.savefig(out_file)
             plt.close(fig)
             print(f"Saved {out_file}")
@@ -78,21 +62,45 @@ def plot_risk_by_family(df: pd.DataFrame, out_dir: str):
     print("\n✅ All culture-family risk plots saved.")
 
 
-def plot_risk_overview(df: pd.DataFrame, out_dir: str):
+def plot_risk_curves(cube: pd.DataFrame, out_dir: str, metric: str = "risk"):
     """
-    Generate a single overview plot comparing risk across all cultures.
+    Plot `metric` against every swept parameter (e.g. the points of an
+    adaptive sweep over p), one line per rule, for each culture and values of
+    the other sweep parameters (`cube.curves`).
     """
-    df = add_risk_column(df)
     os.makedirs(out_dir, exist_ok=True)
 
-    overview = (
-        df.groupby(["culture", "rule"], as_index=False)
-        .agg({"success_rate": "mean", "harm_rate": "mean", "risk": "mean"})
-    )
+    for param in SWEEP_PARAMS:
+        for point, rows in curves(cube, param):
+            culture, label = point["culture"], sweep_label(cube, point)
+
+            fig, ax = plt.subplots(figsize=(8, 5))
+            for rule, curve in rows.groupby("rule", sort=False):
+                ax.plot(curve[param], curve[metric], marker=".", label=rule)
+
+            ax.set_title(f"{metric.replace('_', ' ').title()} over {param} – {culture}{_suffix(label, ', ')}")
+            ax.set_xlabel(param)
+            ax.set_ylabel(metric.replace("_", " ").title())
+            ax.legend()
+            ax.grid(alpha=0.3)
+            plt.tight_layout()
+
+            out_file = os.path.join(out_dir, f"curve_{metric}_{param}_{culture}{_suffix(label, '_')}.pdf")
+            plt.savefig(out_file)
+            plt.close(fig)
+            print(f"Saved {out_file}")
+
+
+def plot_risk_overview(cube: pd.DataFrame, out_dir: str):
+    """
+    Generate a single overview plot comparing risk across all cultures
+    (one marker per rule and sweep point).
+    """
+    os.makedirs(out_dir, exist_ok=True)
 
     fig, ax = plt.subplots(figsize=(9, 6))
-    for culture in df["culture"].unique():
-        subset = overview[overview["culture"] == culture]
+    for culture in cube["culture"].unique():
+        subset = cube[cube["culture"] == culture]
         ax.scatter(
             subset["success_rate"], subset["harm_rate"],
             s=60, alpha=0.7, label=culture
@@ -111,8 +119,27 @@ def plot_risk_overview(df: pd.DataFrame, out_dir: str):
     print(f"Saved {out_file}")
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plot risk figures from the summary cube.")
+    parser.add_argument("--cube", default=DEFAULT_CUBE)
+    parser.add_argument("--results", default="results/combined.csv",
+                        help="results to build the cube from when --cube does not exist yet")
+    parser.add_argument("--out_dir", default="report/figures")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.cube):
+        cube = load_cube(args.cube)
+    else:
+        cube = build_cube_from_files([args.results])
+        os.makedirs(os.path.dirname(args.cube) or ".", exist_ok=True)
+        cube.to_csv(args.cube, index=False)
+        print(f"Saved cube to {args.cube}")
+
+    plot_risk_by_family(cube, args.out_dir)
+    plot_risk_curves(cube, args.out_dir)
+    plot_risk_overview(cube, args.out_dir)
+    print(f"\nAll risk plots saved to {args.out_dir}/")
+
+
 if __name__ == "__main__":
-    df = pd.read_csv("results/combined.csv")
-    plot_risk_by_family(df, "report/figures")
-    plot_risk_overview(df, "report/figures")
-    print("\nAll risk plots saved to report/figures/")
+    main()
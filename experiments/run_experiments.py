@@ -6,23 +6,16 @@ from __future__ import annotations
 import argparse
 import json
 import os
-from typing import Dict, List, Callable
-import pandas as pd
+import sys
+from typing import Dict, List, Callable, Optional, TYPE_CHECKING
 
-from core.types import MultiIssueElection
-from free_riding.risk import evaluate_risk
+# pandas, the cultures and the rules are imported lazily (see experiments.registry)
+# so that single-cell runs and sweep workers start quickly.
+from experiments.registry import CULTURES, get_rule, rule_names, sample_culture
 
-# Cultures
-from statistical_cultures.p_ic import sample_p_ic, PICConfig
-from statistical_cultures.disjoint import sample_disjoint, DisjointConfig
-from statistical_cultures.resampling import sample_resampling, ResamplingConfig
-from statistical_cultures.hamming_noise import add_hamming_noise
-from statistical_cultures.hamming_noise import HammingConfig, sample_hamming
-
-# Rules
-from voting_rules.utilitarian import sequential_utilitarian
-from voting_rules.sequential_thiele import sequential_thiele
-from voting_rules.owa import owa_rule, leximin_owa
+if TYPE_CHECKING:
+    import pandas as pd
+    from core.types import MultiIssueElection
 
 
 # =====================
@@ -31,37 +24,19 @@ from voting_rules.owa import owa_rule, leximin_owa
 def make_rules(n_voters: int) -> Dict[str, Callable[[MultiIssueElection], object]]:
     """
     Construct rules dictionary dynamically.
-    Includes Thiele rules, utilitarian, and parametric OWA rules.
+    Includes Thiele rules, utilitarian, and parametric OWA rules
+    (OWA parameters larger than n_voters-1 are skipped).
+    Rules are built once per name and shared between calls.
     """
-    rules: Dict[str, Callable] = {
-        # Utilitarian as baseline (same as Thiele x=0 and OWA mean)
-        "utilitarian": lambda elec: sequential_utilitarian(elec),
-    }
-
-    # Parametric Thiele rules (subset suggested by professor)
-    thiele_x_values = [1, 5, 7]  # drop x=0 (utilitarian already included)
-    for x in thiele_x_values:
-        rules[f"thiele_x{x}"] = lambda elec, xx=x: sequential_thiele(elec, x=xx)
-
-    # Parametric OWA rules (subset suggested by professor)
-    owa_x_values = [1, 5, 10, 15]
-    for x in owa_x_values:
-        rules[f"owa_x{x}"] = lambda elec, xx=x: owa_rule(elec, x=xx)
-
-    # Leximin OWA for completeness
-    rules["owa_leximin"] = lambda elec: leximin_owa(elec)
-
-    return rules
-
-
-# Now includes Hamming
-CULTURES = ["p_ic", "disjoint", "resampling", "hamming"]
+    return {name: get_rule(name) for name in rule_names(n_voters)}
 
 
 # =====================
 # EXPERIMENT RUNNERS
 # =====================
 def run_single_experiment(elec: MultiIssueElection, rules: Dict[str, Callable]) -> Dict:
+    from free_riding.risk import evaluate_risk
+
     results = {}
     for name, func in rules.items():
         out = func(elec)
@@ -84,54 +59,13 @@ def run_batch(
     groups: int = 2,
     noise_prob: float = 0.1,
 ) -> pd.DataFrame:
-    cands_per_issue = [cands] * issues
-    rows = []
-    rules = make_rules(n_voters)
+    import pandas as pd
+    from experiments.worker import run_seeds
 
-    for s in range(seeds):
-        # ---- culture selection ----
-        if culture == "p_ic":
-            cfg = PICConfig(n_voters=n_voters, candidates_per_issue=cands_per_issue, p=p, seed=s)
-            elec = sample_p_ic(cfg)
-        elif culture == "disjoint":
-            cfg = DisjointConfig(
-                n_voters=n_voters, candidates_per_issue=cands_per_issue,
-                n_groups=groups, p=p, seed=s
-            )
-            elec = sample_disjoint(cfg)
-        elif culture == "resampling":
-            cfg = ResamplingConfig(
-                n_voters=n_voters, candidates_per_issue=cands_per_issue,
-                p=p, phi=phi, seed=s
-            )
-            elec = sample_resampling(cfg)
-        elif culture == "hamming":
-            cfg = HammingConfig(
-                base="p_ic",   # default base culture
-                n_voters=n_voters,
-                candidates_per_issue=cands_per_issue,
-                p=p,
-                phi=phi,
-                groups=groups,
-                noise_prob=noise_prob,
-                seed=s
-            )
-            elec = sample_hamming(cfg)
-        else:
-            raise ValueError("Unknown culture")
-
-        # ---- rule application ----
-        rule_func = rules[rule]
-        out = rule_func(elec)
-        risk = evaluate_risk(elec, rule_func)
-
-        rows.append({
-            "seed": s,
-            "culture": culture,
-            "rule": rule,
-            "winners": out.winners,
-            **risk,
-        })
+    rows = run_seeds(
+        culture=culture, rule=rule, n_voters=n_voters, issues=issues, cands=cands,
+        seeds=seeds, p=p, phi=phi, groups=groups, noise_prob=noise_prob,
+    )
     return pd.DataFrame(rows)
 
 
@@ -145,7 +79,7 @@ def summarize_results(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def df_to_latex_table(df: pd.DataFrame, file: str) -> None:
-    os.makedirs(os.path.dirname(file), exist_ok=True)
+    os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
 
     latex_str = df.to_latex(
         index=False,
@@ -166,7 +100,26 @@ def df_to_latex_table(df: pd.DataFrame, file: str) -> None:
 # =====================
 # CLI ENTRYPOINT
 # =====================
-def main():
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # Subcommands are dispatched before the flat experiment flags are parsed
+    if argv and argv[0] == "sweep":
+        from experiments.sweep import main as sweep_main
+        return sweep_main(argv[1:])
+    if argv and argv[0] == "merge":
+        from experiments.shards import merge_main
+        return merge_main(argv[1:])
+    if argv and argv[0] == "adaptive":
+        from experiments.adaptive import main as adaptive_main
+        return adaptive_main(argv[1:])
+    if argv and argv[0] == "cube":
+        from experiments.cube import cube_main
+        return cube_main(argv[1:])
+    if argv and argv[0] == "serve":
+        from experiments.server import main as serve_main
+        return serve_main(argv[1:])
+
     parser = argparse.ArgumentParser(description="Run free-riding experiments.")
     parser.add_argument("--culture", choices=CULTURES, help="single culture run")
     parser.add_argument("--rule", help="rule to evaluate")
@@ -182,11 +135,45 @@ def main():
     parser.add_argument("--summary", action="store_true")
     parser.add_argument("--latex", type=str, default=None)
     parser.add_argument("--batch", choices=["all"], help="run all cultures × rules")
-    args = parser.parse_args()
-
-    rules = make_rules(args.n_voters)
+    parser.add_argument("--data", type=str, default=None,
+                        help="evaluate --rule on a PrefLib-style or 0/1 CSV approval file instead of a culture")
+    parser.add_argument("--shard", type=str, default=None,
+                        help="i/N: run only shard i (0-based) of the (culture, rule, seed) cells; "
+                             "combine the shards with the `merge` subcommand")
+    args = parser.parse_args(argv)
+
+    if args.data:
+        # loaded data is a single fixed profile: only the single-run output applies
+        clashes = [flag for flag, used in [
+            ("--culture", args.culture), ("--batch", args.batch), ("--shard", args.shard),
+            ("--seeds", args.seeds > 1), ("--csv", args.csv), ("--summary", args.summary),
+            ("--latex", args.latex),
+        ] if used]
+        if clashes:
+            parser.error(f"--data evaluates one loaded profile and cannot be combined with {', '.join(clashes)}")
+        if not args.rule:
+            parser.error("--data needs --rule")
+
+    if args.shard:
+        from experiments.shards import parse_shard, run_shard, write_shard
+
+        index, count = parse_shard(args.shard)
+        if args.batch == "all":
+            cultures, rules = CULTURES, rule_names(args.n_voters)
+        elif args.culture and args.rule:
+            cultures, rules = [args.culture], [args.rule]
+        else:
+            parser.error("--shard needs --batch all or both --culture and --rule")
+        params = {k: getattr(args, k) for k in
+                  ("n_voters", "issues", "cands", "seeds", "p", "phi", "groups", "noise_prob")}
+        rows, meta = run_shard(index, count, cultures, rules, params)
+        write_shard(args.csv or f"results/shards/shard-{index}-of-{count}.csv", rows, meta)
+        return
 
     if args.batch == "all":
+        import pandas as pd
+
+        rules = make_rules(args.n_voters)
         all_summaries: List[pd.DataFrame] = []
         for culture in CULTURES:
             for rule in rules.keys():
@@ -207,7 +194,8 @@ def main():
         combined = pd.concat(all_summaries, ignore_index=True)
         print("Combined summary:\n", combined)
         if args.latex:
-            df_to_latex_table(combined, args.latex)
+            from experiments.cube import build_cube, summary_table
+            df_to_latex_table(summary_table(build_cube([combined])), args.latex)
         if args.csv:
             os.makedirs(os.path.dirname(args.csv), exist_ok=True)
             combined.to_csv(args.csv, index=False)
@@ -236,26 +224,19 @@ def main():
             print("\nSummary statistics:")
             print(summary.to_string(index=False))
             if args.latex:
-                df_to_latex_table(summary, args.latex)
+                from experiments.cube import build_cube, summary_table
+                df_to_latex_table(summary_table(build_cube([df])), args.latex)
     else:
-        # single run
-        if args.culture == "p_ic":
-            cfg = PICConfig(n_voters=args.n_voters, candidates_per_issue=[args.cands]*args.issues, p=args.p, seed=args.seeds)
-            elec = sample_p_ic(cfg)
-        elif args.culture == "disjoint":
-            cfg = DisjointConfig(n_voters=args.n_voters, candidates_per_issue=[args.cands]*args.issues, n_groups=args.groups, p=args.p, seed=args.seeds)
-            elec = sample_disjoint(cfg)
-        elif args.culture == "resampling":
-            cfg = ResamplingConfig(n_voters=args.n_voters, candidates_per_issue=[args.cands]*args.issues, p=args.p, phi=args.phi, seed=args.seeds)
-            elec = sample_resampling(cfg)
-        elif args.culture == "hamming":
-            cfg = PICConfig(n_voters=args.n_voters, candidates_per_issue=[args.cands]*args.issues, p=args.p, seed=args.seeds)
-            base = sample_p_ic(cfg)
-            elec = add_hamming_noise(base, noise_prob=args.noise_prob, seed=args.seeds)
+        # single run, on a sampled profile or on loaded data
+        if args.data:
+            from core.loaders import load_election
+            elec = load_election(args.data)
         else:
-            raise ValueError("Unknown culture")
-
-        rule_func = rules[args.rule]
+            elec = sample_culture(
+                args.culture, args.n_voters, [args.cands] * args.issues, seed=args.seeds,
+                p=args.p, phi=args.phi, groups=args.groups, noise_prob=args.noise_prob,
+            )
+        rule_func = get_rule(args.rule)
         results = run_single_experiment(elec, {args.rule: rule_func})
         print(json.dumps(results, indent=2))
 
@@ -0,0 +1,326 @@
+# File: experiments/server.py
+# Long-running local evaluation server (JSON over HTTP, localhost only).
+#
+# Tools that would otherwise start `run_experiments` once per query can keep
+# one server running and POST their queries to it. The server keeps warm
+# across requests: the registry's rule objects (with their per-shape weight
+# tables), an LRU cache of sampled culture profiles, and a process pool for
+# the free-riding detector. Requests are handled on their own threads, so
+# concurrent queries run in parallel (the detector runs in the pool).
+#
+#   python -m experiments.run_experiments serve --port 8765 --workers 4
+#
+# Endpoints (POST, JSON body; every response is JSON):
+#   /winners   {"election": ..., "rules": [...]} -> {"winners": {rule: [...]}}
+#   /risk      same request                    -> {"risk": {rule: evaluate_risk(...)}}
+#   /welfare   same request                    -> {"welfare": {rule: welfare_summary(...)}}
+#   /evaluate  same request                    -> all three
+# and GET /health for the rules, cache and pool state.
+#
+# "election" is either a profile or a culture spec:
+#   {"approvals": [[[0, 1], [1, 0]], ...], "offsets": null}
+#       (n_voters, n_issues, n_cands) tensor, or (n_voters, total_candidates)
+#       with the issues' column "offsets" for ragged elections
+#   {"culture": "p_ic", "n_voters": 10, "issues": 3, "cands": 3, "seed": 0,
+#    "p": 0.5, "phi": 0.5, "groups": 2, "noise_prob": 0.1}
+#       (omitted parameters take the defaults of `run_experiments`)
+# "rules" defaults to all rules for the election's number of voters.
+# Errors are answered with status 400 (404 for unknown paths, 500 for failures
+# of the server itself) and {"error": ...}.
+
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import json
+import os
+import socket
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from experiments.registry import CULTURES, get_rule, rule_names, sample_culture
+
+DEFAULT_PORT = 8765
+PROFILE_CACHE = 256
+MAX_BODY = 256 * 1024 * 1024
+MAX_PROFILE_CELLS = 50_000_000  # n_voters × issues × cands of a sampled profile
+
+CULTURE_DEFAULTS = {
+    "n_voters": 10,
+    "issues": 3,
+    "cands": 3,
+    "seed": 0,
+    "p": 0.5,
+    "phi": 0.5,
+    "groups": 2,
+    "noise_prob": 0.1,
+}
+INT_FIELDS = {"n_voters", "issues", "cands", "seed", "groups"}
+ENDPOINTS = {
+    "/winners": ("winners",),
+    "/risk": ("risk",),
+    "/welfare": ("welfare",),
+    "/evaluate": ("winners", "risk", "welfare"),
+}
+
+
+def _warm_up() -> None:
+    """Import the rule, detector and welfare modules (also run in every pool worker)."""
+    import free_riding.risk  # noqa: F401
+    import free_riding.welfare  # noqa: F401
+    for name in rule_names(2):
+        get_rule(name)
+
+
+def _risk(elec, rule: str) -> Dict:
+    from free_riding.risk import evaluate_risk
+    return evaluate_risk(elec, get_rule(rule))
+
+
+class ProfileCache:
+    """Thread-safe LRU cache of sampled profiles, keyed by their culture spec."""
+
+    def __init__(self, size: int = PROFILE_CACHE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple):
+        with self._lock:
+            elec = self._items.get(key)
+            if elec is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            return elec
+
+    def put(self, key: Tuple, elec) -> None:
+        with self._lock:
+            self.misses += 1
+            self._items[key] = elec
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class Evaluator:
+    """
+    Request-independent state of the server: profile cache and detector pool.
+
+    Parameters
+    ----------
+    workers : processes for the free-riding detector (<= 1 evaluates it on
+              the request thread)
+    cache_size : number of sampled profiles kept
+    """
+
+    def __init__(self, workers: int = 1, cache_size: int = PROFILE_CACHE):
+        _warm_up()
+        self.profiles = ProfileCache(cache_size)
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_up) if workers > 1 else None
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def election(self, spec: Dict):
+        """MultiIssueElection from a request's "election" object."""
+        from core.types import MultiIssueElection
+
+        if not isinstance(spec, dict):
+            raise ValueError('"election" must be an object with "approvals" or "culture"')
+        if "approvals" in spec:
+            approvals = np.asarray(spec["approvals"], dtype=np.int64)
+            if approvals.ndim not in (2, 3) or approvals.size == 0:
+                raise ValueError("approvals must be a non-empty (n_voters, n_issues, n_cands) "
+                                 "or (n_voters, total_candidates) array")
+            if np.any((approvals != 0) & (approvals != 1)):
+                raise ValueError("approvals must be 0 or 1")
+            offsets = spec.get("offsets")
+            if offsets is None and approvals.ndim == 2:
+                raise ValueError("2-D approvals need the issues' column offsets")
+            if offsets is not None and approvals.ndim == 3:
+                raise ValueError("offsets only apply to 2-D (ragged) approvals")
+            return MultiIssueElection(approvals, offsets)
+
+        unknown = set(spec) - set(CULTURE_DEFAULTS) - {"culture"}
+        if unknown:
+            raise ValueError(f"Unknown culture parameters: {sorted(unknown)}")
+        if spec.get("culture") not in CULTURES:
+            raise ValueError(f"Unknown culture: {spec.get('culture')}")
+        params = {**CULTURE_DEFAULTS, **spec}
+        for name in CULTURE_DEFAULTS:
+            params[name] = int(params[name]) if name in INT_FIELDS else float(params[name])
+        for name in ("n_voters", "issues", "cands", "groups"):
+            if params[name] < 1:
+                raise ValueError(f"{name} must be at least 1")
+        if params["n_voters"] * params["issues"] * params["cands"] > MAX_PROFILE_CELLS:
+            raise ValueError(f"n_voters × issues × cands exceeds {MAX_PROFILE_CELLS}")
+        key = tuple(sorted(params.items()))
+        elec = self.profiles.get(key)
+        if elec is None:
+            elec = sample_culture(
+                params["culture"], params["n_voters"], [params["cands"]] * params["issues"],
+                seed=params["seed"], p=params["p"], phi=params["phi"],
+                groups=params["groups"], noise_prob=params["noise_prob"],
+            )
+            self.profiles.put(key, elec)
+        return elec
+
+    def evaluate(self, request: Dict, parts: Tuple[str, ...]) -> Dict:
+        """Answer a request with the given parts (winners, risk, welfare)."""
+        from free_riding.welfare import welfare_summary
+
+        if not isinstance(request, dict) or "election" not in request:
+            raise ValueError('request body must be an object with an "election"')
+        elec = self.election(request["election"])
+        rules = request.get("rules") or rule_names(elec.n_voters)
+        if not isinstance(rules, list):
+            raise ValueError('"rules" must be a list of rule names')
+        if not all(isinstance(name, str) for name in rules):
+            raise ValueError('"rules" must be a list of rule names')
+        # Unknown names and parameters that do not fit the election (e.g.
+        # owa_x15 for 8 voters) are rejected here, before any work is queued
+        rule_objs = {name: get_rule(name) for name in rules}
+        for rule in rule_objs.values():
+            rule.tables(elec)
+
+        response: Dict = {"n_voters": elec.n_voters, "n_issues": elec.n_issues}
+        futures = {}
+        if "risk" in parts:
+            if self.pool is None:
+                response["risk"] = {name: _risk(elec, name) for name in rule_objs}
+            else:
+                futures = {name: self.pool.submit(_risk, elec, name) for name in rule_objs}
+        try:
+            winners = {name: [int(w) for w in rule(elec).winners] for name, rule in rule_objs.items()}
+            if "winners" in parts:
+                response["winners"] = winners
+            if "welfare" in parts:
+                response["welfare"] = {name: welfare_summary(elec, w) for name, w in winners.items()}
+            if futures:
+                response["risk"] = {name: f.result() for name, f in futures.items()}
+        finally:
+            for f in futures.values():
+                f.cancel()
+        return response
+
+    def health(self) -> Dict:
+        return {
+            "status": "ok",
+            "rules": rule_names(10 ** 9),  # all default rules; small elections drop large OWA x
+            "cultures": CULTURES,
+            "workers": self.workers,
+            "profiles": {"cached": len(self.profiles), "hits": self.profiles.hits,
+                         "misses": self.profiles.misses},
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "free-riding-eval/1"
+
+    def _reply(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, self.server.evaluator.health())
+        else:
+            self._reply(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        parts = ENDPOINTS.get(self.path)
+        if parts is None:
+            self._reply(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY:
+                raise ValueError(f"request body exceeds {MAX_BODY} bytes")
+            request = json.loads(self.rfile.read(length) or b"null")
+            self._reply(200, self.server.evaluator.evaluate(request, parts))
+        except (ValueError, TypeError) as err:
+            self._reply(400, {"error": str(err)})
+        except Exception as err:
+            self.log_error("%s failed: %r", self.path, err)
+            self._reply(500, {"error": f"{type(err).__name__}: {err}"})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _loopback_address(host: str, port: int) -> Tuple[int, Tuple]:
+    """
+    Resolve `host` (a name such as "localhost" or an address) to the socket
+    family and address to bind. Raises ValueError unless every address it
+    resolves to is a loopback address.
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as err:
+        raise ValueError(f"Cannot resolve host {host!r}: {err}") from None
+    if not infos or not all(ipaddress.ip_address(info[4][0]).is_loopback for info in infos):
+        raise ValueError(f"The evaluation server only listens on loopback addresses, not {host}")
+    family, _, _, _, address = infos[0]
+    return family, address
+
+
+class EvaluationServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer bound to a loopback address, holding an `Evaluator`."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = 1,
+                 cache_size: int = PROFILE_CACHE, verbose: bool = False):
+        family, address = _loopback_address(host, port)
+        self.address_family = family
+        self.evaluator = Evaluator(workers, cache_size)
+        self.verbose = verbose
+        super().__init__(address, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.evaluator.close()
+
+
+# =====================
+# CLI ENTRYPOINT
+# =====================
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="run_experiments serve",
+        description="Serve winners, free-riding risk and welfare over JSON/HTTP on localhost.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="loopback address to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes for the free-riding detector")
+    parser.add_argument("--cache", type=int, default=PROFILE_CACHE, help="sampled profiles kept")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = EvaluationServer(args.host, args.port, args.workers, args.cache, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port} ({args.workers} worker(s)); Ctrl-C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,203 @@
+# File: experiments/shards.py
+# Sharded experiment runs across machines.
+#
+# The (culture, rule, seed) cell space of a run is enumerated in a fixed order
+# and shard i of N takes every N-th cell starting at i. Each shard writes its
+# per-seed rows to a CSV plus a `.meta.json` sidecar describing the run; `merge`
+# checks that the shards describe the same run and together cover every cell
+# exactly once, then produces the same combined summary as a single
+# `--batch all` run. Only files are exchanged, so shards can run anywhere and
+# be merged from a shared directory or from copied files.
+#
+#   python -m experiments.run_experiments --batch all --seeds 50 --shard 0/4 --csv results/shards/s0.csv
+#   ...
+#   python -m experiments.run_experiments merge results/shards --csv results/combined.csv
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+META_SUFFIX = ".meta.json"
+
+Cell = Tuple[str, str, int]
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse 'i/N' (0 <= i < N) into (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {spec!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must satisfy 0 <= i < N, got {spec!r}")
+    return index, count
+
+
+def cell_space(cultures: Sequence[str], rules: Sequence[str], seeds: int) -> List[Cell]:
+    """All (culture, rule, seed) cells of a run, in the order of a single run."""
+    return [(c, r, s) for c in cultures for r in rules for s in range(seeds)]
+
+
+def shard_cells(cells: Sequence[Cell], index: int, count: int) -> List[Cell]:
+    """
+    Cells assigned to shard `index` of `count`: every count-th cell.
+    Interleaving spreads each (culture, rule) over all shards, which keeps the
+    shards' running times close even when some rules are much slower.
+    """
+    return list(cells[index::count])
+
+
+def meta_path(csv_path: str) -> str:
+    return csv_path + META_SUFFIX
+
+
+def run_shard(
+    index: int,
+    count: int,
+    cultures: Sequence[str],
+    rules: Sequence[str],
+    params: Dict,
+) -> Tuple[List[Dict], Dict]:
+    """
+    Evaluate the cells of one shard.
+
+    `params` holds n_voters, issues, cands, seeds, p, phi, groups and noise_prob.
+    Returns the per-seed rows and the metadata written next to them.
+    """
+    from experiments.worker import run_seed
+
+    cell_params = {k: v for k, v in params.items() if k != "seeds"}
+    cells = shard_cells(cell_space(cultures, rules, params["seeds"]), index, count)
+    rows = [run_seed(culture, rule, seed=seed, **cell_params) for culture, rule, seed in cells]
+    meta = {
+        "shard": index,
+        "of": count,
+        "cultures": list(cultures),
+        "rules": list(rules),
+        "params": dict(params),
+        "cells": len(cells),
+    }
+    return rows, meta
+
+
+def write_shard(path: str, rows: List[Dict], meta: Dict) -> None:
+    """
+    Write the rows of a shard and then its metadata. The metadata is written
+    last, so a shard without it was interrupted and is rejected by `merge`.
+    """
+    import pandas as pd
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    columns = ["seed", "culture", "rule", "winners"]
+    df = pd.DataFrame(rows) if rows else pd.DataFrame(columns=columns)
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    with open(meta_path(path), "w") as f:
+        json.dump(meta, f, indent=2)
+    print(f"Saved shard {meta['shard']}/{meta['of']} ({meta['cells']} cells) to {path}")
+
+
+def find_shards(paths: Sequence[str]) -> List[str]:
+    """Shard CSVs among `paths`; a directory stands for every shard CSV in it."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += sorted(p[:-len(META_SUFFIX)] for p in glob.glob(os.path.join(path, "*" + META_SUFFIX)))
+        else:
+            found.append(path)
+    return found
+
+
+def _load_meta(path: str) -> Dict:
+    try:
+        with open(meta_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"{path}: no {META_SUFFIX} sidecar (shard incomplete or not a shard)") from None
+
+
+def _describe(cells: List[Cell], limit: int = 5) -> str:
+    shown = ", ".join(f"{c}/{r}/seed {s}" for c, r, s in cells[:limit])
+    return shown + (f" and {len(cells) - limit} more" if len(cells) > limit else "")
+
+
+def merge_shards(paths: Sequence[str]) -> pd.DataFrame:
+    """
+    Combine shard outputs into the summary a single run would produce
+    (one row per culture × rule, in the run's order).
+
+    Raises ValueError if the shards belong to different runs, or if any
+    cell is missing, duplicated or not part of the run.
+    """
+    import pandas as pd
+    from experiments.run_experiments import summarize_results
+
+    paths = find_shards(paths)
+    if not paths:
+        raise ValueError("No shard files given")
+
+    metas = [_load_meta(p) for p in paths]
+    run = {k: metas[0][k] for k in ("of", "cultures", "rules", "params")}
+    for path, meta in zip(paths, metas):
+        if any(meta[k] != v for k, v in run.items()):
+            raise ValueError(f"{path} belongs to a different run than {paths[0]}")
+
+    frames = [pd.read_csv(p, float_precision="round_trip") for p in paths]
+    df = pd.concat(frames, ignore_index=True)
+
+    expected = cell_space(run["cultures"], run["rules"], run["params"]["seeds"])
+    seen = Counter(zip(df["culture"], df["rule"], (int(s) for s in df["seed"])))
+    missing = [c for c in expected if c not in seen]
+    duplicated = [c for c in expected if seen.get(c, 0) > 1]
+    unexpected = sorted(set(seen) - set(expected))
+    problems = []
+    if missing:
+        problems.append(f"{len(missing)} missing cells: {_describe(missing)}")
+    if duplicated:
+        problems.append(f"{len(duplicated)} duplicated cells: {_describe(duplicated)}")
+    if unexpected:
+        problems.append(f"{len(unexpected)} cells outside the run: {_describe(unexpected)}")
+    if problems:
+        shards = sorted(Counter(m["shard"] for m in metas).items())
+        problems.append(f"shards present (index: files): {dict(shards)} of {run['of']}")
+        raise ValueError("Cannot merge shards:\n  " + "\n  ".join(problems))
+
+    summaries = []
+    for culture in run["cultures"]:
+        for rule in run["rules"]:
+            cell = df[(df["culture"] == culture) & (df["rule"] == rule)]
+            summaries.append(summarize_results(cell.sort_values("seed").reset_index(drop=True)))
+    return pd.concat(summaries, ignore_index=True)
+
+
+def merge_main(argv: Optional[List[str]] = None):
+    from experiments.run_experiments import df_to_latex_table
+
+    parser = argparse.ArgumentParser(
+        prog="run_experiments merge",
+        description="Merge sharded run outputs into the combined summary.",
+    )
+    parser.add_argument("paths", nargs="+", help="shard CSVs or directories containing them")
+    parser.add_argument("--csv", type=str, default=None)
+    parser.add_argument("--latex", type=str, default=None)
+    args = parser.parse_args(argv)
+
+    combined = merge_shards(args.paths)
+    print("Combined summary:\n", combined)
+    if args.latex:
+        from experiments.cube import build_cube, summary_table
+        df_to_latex_table(summary_table(build_cube([combined])), args.latex)
+    if args.csv:
+        os.makedirs(os.path.dirname(args.csv) or ".", exist_ok=True)
+        combined.to_csv(args.csv, index=False)
+        print(f"Saved combined results to {args.csv}")
+    return combined
@@ -0,0 +1,310 @@
+# File: experiments/sweep.py
+# Parameter sweeps: expand a grid over culture parameters into cells,
+# deduplicate them, run them on local worker processes and consolidate
+# everything into one result store indexed by the parameters.
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from experiments.registry import CULTURES, rule_fits, rule_names
+from experiments import worker
+
+
+# Sweepable parameters and the values used when a grid leaves them out
+SWEEP_PARAMS = ["n_voters", "issues", "cands", "p", "phi", "groups", "noise_prob"]
+DEFAULTS = {
+    "n_voters": 10,
+    "issues": 3,
+    "cands": 3,
+    "p": 0.5,
+    "phi": 0.5,
+    "groups": 2,
+    "noise_prob": 0.1,
+}
+INT_PARAMS = {"n_voters", "issues", "cands", "groups"}
+
+# Parameters that actually reach each culture's sampler. The others are
+# dropped from a cell, so e.g. a sweep over phi does not re-run p-IC cells.
+CULTURE_PARAMS = {
+    "p_ic": {"n_voters", "issues", "cands", "p"},
+    "disjoint": {"n_voters", "issues", "cands", "p", "groups"},
+    "resampling": {"n_voters", "issues", "cands", "p", "phi"},
+    "hamming": {"n_voters", "issues", "cands", "p", "noise_prob"},  # base culture is p-IC
+}
+
+INDEX_COLUMNS = ["culture", "rule"] + SWEEP_PARAMS
+
+
+@dataclass(frozen=True)
+class SweepCell:
+    """
+    One unit of work of a sweep: a culture, a rule and a parameter point.
+
+    Parameters that do not influence the culture are stored as None so that
+    identical cells compare (and hash) equal.
+    """
+    culture: str
+    rule: str
+    n_voters: int
+    issues: int
+    cands: int
+    p: Optional[float] = None
+    phi: Optional[float] = None
+    groups: Optional[int] = None
+    noise_prob: Optional[float] = None
+
+    def key(self) -> Tuple:
+        return tuple(getattr(self, c) for c in INDEX_COLUMNS)
+
+
+# =====================
+# GRID SPECIFICATION
+# =====================
+def parse_values(text: str, name: str = "") -> List:
+    """
+    Parse a CLI value specification.
+
+    Accepted forms:
+      "0.5"          single value
+      "10,20,40"     explicit list
+      "0.1:0.9:0.2"  inclusive range start:stop:step
+    """
+    cast = int if name in INT_PARAMS else float
+    text = text.strip()
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) != 3:
+            raise ValueError(f"Range for {name!r} must be start:stop:step; got {text!r}")
+        return _inclusive_range(*(cast(x) for x in parts), name=name)
+    return [cast(x) for x in text.split(",") if x.strip()]
+
+
+def _inclusive_range(start, stop, step, name: str = "") -> List:
+    if step <= 0:
+        raise ValueError(f"Step for {name!r} must be positive; got {step}")
+    values = []
+    n_steps = int(round((stop - start) / step))
+    for i in range(n_steps + 1):
+        v = start + i * step
+        if v > stop + 1e-9:
+            break
+        values.append(round(v, 10) if isinstance(v, float) else v)
+    return values
+
+
+def _normalize_values(name: str, value) -> List:
+    """Turn a grid entry from a spec file (scalar, list, string or dict) into a list."""
+    cast = int if name in INT_PARAMS else float
+    if isinstance(value, str):
+        return parse_values(value, name)
+    if isinstance(value, dict):
+        return _inclusive_range(cast(value["start"]), cast(value["stop"]), cast(value["step"]), name=name)
+    if isinstance(value, (list, tuple)):
+        return [cast(v) for v in value]
+    return [cast(value)]
+
+
+def load_spec(path: str) -> dict:
+    """
+    Load a grid specification from a JSON or YAML file.
+
+    Example (JSON):
+      {
+        "cultures": ["p_ic", "disjoint"],
+        "rules": ["thiele_x1", "owa_x1"],
+        "seeds": 30,
+        "grid": {"n_voters": [10, 20], "p": "0.1:0.9:0.2"}
+      }
+    YAML files require PyYAML.
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML grid specs require PyYAML (pip install pyyaml)") from e
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def expand_grid(
+    grid: Dict[str, List],
+    cultures: List[str],
+    rules: Optional[List[str]] = None,
+) -> List[SweepCell]:
+    """
+    Expand a grid into the list of distinct cells, in a stable order.
+
+    Cells that differ only in parameters irrelevant to their culture are merged.
+    `rules` may name any registry rule (default: the experiments' rule set);
+    unknown names raise ValueError. Rules that are undefined for a given
+    n_voters (e.g. owa_x15 with 10 voters) are skipped for that parameter point.
+    """
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    for culture in cultures:
+        if culture not in CULTURES:
+            raise ValueError(f"Unknown culture: {culture}")
+    for rule in rules or []:
+        rule_fits(rule, 1)  # raises for unknown names
+
+    axes = {name: _normalize_values(name, grid.get(name, DEFAULTS[name])) for name in SWEEP_PARAMS}
+
+    cells: List[SweepCell] = []
+    seen = set()
+    for values in product(*(axes[name] for name in SWEEP_PARAMS)):
+        point = dict(zip(SWEEP_PARAMS, values))
+        wanted = rule_names(point["n_voters"]) if rules is None else rules
+        for rule in wanted:
+            if not rule_fits(rule, point["n_voters"]):
+                continue
+            for culture in cultures:
+                relevant = CULTURE_PARAMS[culture]
+                params = {k: (v if k in relevant else None) for k, v in point.items()}
+                cell = SweepCell(culture=culture, rule=rule, **params)
+                if cell not in seen:
+                    seen.add(cell)
+                    cells.append(cell)
+    return cells
+
+
+# =====================
+# EXECUTION
+# =====================
+def run_cell(cell: SweepCell, seeds: int) -> dict:
+    """
+    Evaluate one cell over `seeds` seeds and return its summary row.
+    Runs through the pandas-free `experiments.worker` entry point.
+    """
+    kwargs = {k: v for k, v in asdict(cell).items() if v is not None}
+    row = worker.run_cell(seeds=seeds, **kwargs)
+    row.update(asdict(cell))
+    return row
+
+
+def run_sweep(cells: List[SweepCell], seeds: int, workers: int = 1) -> pd.DataFrame:
+    """
+    Run all cells, in parallel when workers > 1, and collect one row per cell.
+    """
+    rows = []
+    if workers <= 1:
+        for cell in cells:
+            rows.append(run_cell(cell, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_cell, cell, seeds) for cell in cells]
+            for fut in as_completed(futures):
+                rows.append(fut.result())
+    return _to_store_frame(rows)
+
+
+def _to_store_frame(rows: List[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return pd.DataFrame(columns=INDEX_COLUMNS + ["seeds"])
+    value_cols = [c for c in df.columns if c not in INDEX_COLUMNS]
+    df = df[INDEX_COLUMNS + value_cols]
+    return df.sort_values(INDEX_COLUMNS, na_position="first", kind="stable").reset_index(drop=True)
+
+
+def load_store(path: str) -> pd.DataFrame:
+    """Read a sweep result store; parameters irrelevant to a culture are empty."""
+    df = pd.read_csv(path)
+    return df.astype(object).where(df.notna(), None)
+
+
+def _cell_from_row(row: dict) -> SweepCell:
+    kwargs = {}
+    for c in INDEX_COLUMNS:
+        v = row.get(c)
+        if v is not None and c in INT_PARAMS:
+            v = int(v)
+        elif v is not None and c in SWEEP_PARAMS:
+            v = float(v)
+        kwargs[c] = v
+    return SweepCell(**kwargs)
+
+
+def update_store(path: str, cells: List[SweepCell], seeds: int, workers: int = 1,
+                 overwrite: bool = False) -> pd.DataFrame:
+    """
+    Run the cells missing from the store at `path` and write the merged store.
+
+    Cells already present with the same number of seeds are reused unless
+    `overwrite` is set.
+    """
+    existing = pd.DataFrame()
+    if os.path.exists(path) and not overwrite:
+        existing = load_store(path)
+        done = {
+            _cell_from_row(row)
+            for row in existing.to_dict("records")
+            if int(row["seeds"]) == seeds
+        }
+        todo = [c for c in cells if c not in done]
+        keys = {c.key() for c in todo}
+        existing = existing[[_cell_from_row(r).key() not in keys for r in existing.to_dict("records")]]
+    else:
+        todo = cells
+
+    print(f"Sweep: {len(cells)} cells, {len(todo)} to run on {workers} worker(s)")
+    fresh = run_sweep(todo, seeds=seeds, workers=workers)
+    merged = _to_store_frame(existing.to_dict("records") + fresh.to_dict("records"))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    merged.to_csv(path, index=False)
+    print(f"Saved sweep results to {path}")
+    return merged
+
+
+# =====================
+# CLI ENTRYPOINT
+# =====================
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="run_experiments sweep",
+        description="Sweep free-riding experiments over a parameter grid.",
+    )
+    parser.add_argument("--spec", help="JSON/YAML grid specification file")
+    parser.add_argument(
+        "--grid", action="append", default=[], metavar="NAME=VALUES",
+        help="grid axis, e.g. n_voters=10,20 or p=0.1:0.9:0.2 (repeatable)",
+    )
+    parser.add_argument("--cultures", nargs="+", choices=CULTURES)
+    parser.add_argument("--rules", nargs="+", help="rule names (default: all)")
+    parser.add_argument("--seeds", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="results/sweep.csv")
+    parser.add_argument("--overwrite", action="store_true", help="ignore cells already in the store")
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec) if args.spec else {}
+    grid = dict(spec.get("grid", {}))
+    for item in args.grid:
+        name, _, values = item.partition("=")
+        if not values:
+            parser.error(f"--grid expects NAME=VALUES; got {item!r}")
+        grid[name.strip()] = parse_values(values, name.strip())
+
+    cultures = args.cultures or spec.get("cultures") or CULTURES
+    rules = args.rules or spec.get("rules")
+    seeds = args.seeds or spec.get("seeds", 1)
+
+    cells = expand_grid(grid, cultures, rules)
+    update_store(args.out, cells, seeds=seeds, workers=args.workers, overwrite=args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# File: experiments/worker.py
+# Lightweight entry point for evaluating one experiment cell.
+#
+# Imports only NumPy plus the culture/rule modules a cell needs (no pandas),
+# so it is cheap to start from sweep workers and shell loops:
+#   python -m experiments.worker --culture p_ic --rule thiele_x1 --seeds 10
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, List, Optional
+
+from experiments.registry import CULTURES, get_rule, sample_culture
+
+METRICS = ["trials", "eligible", "possible", "successes", "harms", "success_rate", "harm_rate", "risk"]
+
+
+def run_seed(
+    culture: str,
+    rule: str,
+    n_voters: int,
+    issues: int,
+    cands: int,
+    seed: int,
+    p: float = 0.5,
+    phi: float = 0.5,
+    groups: int = 2,
+    noise_prob: float = 0.1,
+) -> Dict:
+    """Row of one (culture, rule, seed) cell."""
+    from free_riding.risk import evaluate_risk
+
+    rule_func = get_rule(rule)
+    elec = sample_culture(
+        culture, n_voters, [cands] * issues, seed=seed,
+        p=p, phi=phi, groups=groups, noise_prob=noise_prob,
+    )
+    out = rule_func(elec)
+    risk = evaluate_risk(elec, rule_func)
+    return {
+        "seed": seed,
+        "culture": culture,
+        "rule": rule,
+        "winners": [int(w) for w in out.winners],
+        **risk,
+    }
+
+
+def run_seeds(
+    culture: str,
+    rule: str,
+    n_voters: int,
+    issues: int,
+    cands: int,
+    seeds: int,
+    p: float = 0.5,
+    phi: float = 0.5,
+    groups: int = 2,
+    noise_prob: float = 0.1,
+) -> List[Dict]:
+    """Per-seed rows, same content as `run_experiments.run_batch` without pandas."""
+    return [
+        run_seed(culture, rule, n_voters, issues, cands, s,
+                 p=p, phi=phi, groups=groups, noise_prob=noise_prob)
+        for s in range(seeds)
+    ]
+
+
+def summarize_rows(rows: List[Dict]) -> Dict:
+    """Mean of every metric over seeds (mirrors `run_experiments.summarize_results`)."""
+    summary = {"culture": rows[0]["culture"], "rule": rows[0]["rule"], "seeds": len(rows)}
+    for m in METRICS:
+        summary[m] = sum(float(r[m]) for r in rows) / len(rows)
+    return summary
+
+
+def run_cell(seeds: int, **cell) -> Dict:
+    """Evaluate one (culture, rule, parameters) cell and return its summary."""
+    return summarize_rows(run_seeds(seeds=seeds, **cell))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Evaluate one free-riding experiment cell.")
+    parser.add_argument("--culture", choices=CULTURES, required=True)
+    parser.add_argument("--rule", required=True)
+    parser.add_argument("--n_voters", type=int, default=10)
+    parser.add_argument("--issues", type=int, default=3)
+    parser.add_argument("--cands", type=int, default=3)
+    parser.add_argument("--p", type=float, default=0.5)
+    parser.add_argument("--phi", type=float, default=0.5)
+    parser.add_argument("--groups", type=int, default=2)
+    parser.add_argument("--seeds", type=int, default=1)
+    parser.add_argument("--noise_prob", type=float, default=0.1)
+    parser.add_argument("--rows", action="store_true", help="print per-seed rows instead of the summary")
+    args = parser.parse_args(argv)
+
+    cell = vars(args)
+    per_seed = cell.pop("rows")
+    rows = run_seeds(**cell)
+    print(json.dumps(rows if per_seed else summarize_rows(rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# File: free_riding/coalitions.py
+# Coalitional free-riding: t voters with the same ballot jointly drop their
+# approval of the original winner on one issue.
+#
+# Two reductions keep this tractable:
+#   • Ballot-class symmetry. The rules are anonymous, so every coalition of t
+#     voters from the same ballot class behaves identically; one representative
+#     per (class, t, issue) is evaluated and counted C(class size, t) times.
+#   • Pivotality bounds. Rule objects that expose `trace` and
+#     `voter_sensitivity` give the baseline score margins on every issue and,
+#     once per ballot class, bounds on how far a dropped approval moves the
+#     scores. If the dropped issue's margin certainly absorbs the drop, the
+#     manipulation is non-pivotal; if it certainly cannot, it is pivotal; and
+#     if every later margin absorbs the shift, the outcome is the baseline
+#     (Δu = 0). Only the remaining coalitions re-run the rule.
+
+from math import comb
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from core.types import MultiIssueElection
+from free_riding.detector import normalize_outcome
+
+_EPS = 1e-9
+
+
+def ballot_classes(elec: MultiIssueElection) -> List[np.ndarray]:
+    """Groups of voters with identical ballots (voter indices, ascending)."""
+    if elec.is_sparse:
+        keys = elec.ballot_keys()
+        _, inverse = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    else:
+        _, inverse = np.unique(np.asarray(elec.columns), axis=0, return_inverse=True)
+    inverse = np.asarray(inverse).reshape(-1)
+    if not len(inverse):
+        return []
+    order = np.argsort(inverse, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(inverse))[:-1])
+
+
+def _gap(scores: np.ndarray, winner: int) -> float:
+    """
+    How far the winner's score can fall before it loses the argmax: its lead
+    over the best other candidate. (Falls that land within _EPS of the gap are
+    left to a re-run, since ties there are resolved by rounding and index.)
+    """
+    others = np.delete(scores, winner)
+    return float(scores[winner] - others.max()) if len(others) else np.inf
+
+
+def _classify(
+    t: int,
+    bounds: Tuple[float, float, float],
+    gaps: np.ndarray,
+    issue: int,
+) -> Optional[str]:
+    """
+    'pivotal' or 'unchanged' (non-pivotal with the baseline outcome) when the
+    bounds decide it, None when the rule has to be re-run.
+    """
+    drop_lo, drop_hi, later_shift = bounds
+    if t * drop_lo > gaps[issue] + _EPS:
+        return "pivotal"
+    if t * drop_hi < gaps[issue] - _EPS:
+        later = np.asarray(later_shift)[issue + 1:] if np.ndim(later_shift) else later_shift
+        if np.all((later == 0) | (t * later < gaps[issue + 1:] - _EPS)):
+            return "unchanged"
+    return None
+
+
+def detect_coalitional_free_riding(
+    elec: MultiIssueElection,
+    rule,
+    max_size: int = 2,
+    prune: bool = True,
+) -> Dict:
+    """
+    Coalitional analogue of `detect_free_riding`.
+
+    For every coalition size t = 1..max_size, every coalition of t voters with
+    identical ballots and every issue i whose original winner they approve:
+      • the coalition drops that approval (all other approvals truthful);
+      • the manipulation is *possible* if the winner of issue i is unchanged;
+      • success/harm compare the (shared) truthful utility of the members.
+
+    Returns
+    -------
+    dict with
+      by_size : {t: {coalitions, trials, eligible, possible, successes, harms,
+                     success_rate, harm_rate, risk}}
+                counts are over distinct coalitions (not just representatives)
+      evaluated : # manipulated elections on which the rule was re-run
+      pruned    : # representative manipulations decided by the bounds alone
+    For t = 1 the counts equal those of `detect_free_riding`.
+    """
+    use_bounds = prune and hasattr(rule, "trace") and hasattr(rule, "voter_sensitivity")
+    if use_bounds:
+        baseline, scores = rule.trace(elec)
+    else:
+        baseline, scores = normalize_outcome(rule(elec)), None
+    winners = list(baseline.winners)
+    n_issues = elec.n_issues
+
+    gaps = None
+    if use_bounds:
+        gaps = np.array([_gap(np.asarray(sc, dtype=float), w) for sc, w in zip(scores, winners)])
+
+    by_size = {
+        t: {"coalitions": 0, "trials": 0, "eligible": 0, "possible": 0, "successes": 0, "harms": 0}
+        for t in range(1, max_size + 1)
+    }
+    evaluated = 0
+    pruned = 0
+
+    offsets = elec.column_offsets
+    for members in ballot_classes(elec):
+        rep = int(members[0])
+        truthful = elec.voter_row(rep)
+        approved = np.flatnonzero(truthful[offsets[:-1] + np.asarray(winners)] == 1).tolist()
+        base_u = len(approved)
+        # bounds depend on the ballot only: once per class, shared by every t
+        class_bounds = rule.voter_sensitivity(elec, winners, rep) if use_bounds else None
+
+        for t in range(1, min(max_size, len(members)) + 1):
+            mult = comb(len(members), t)
+            stats = by_size[t]
+            stats["coalitions"] += mult
+            stats["trials"] += mult * n_issues
+            stats["eligible"] += mult * len(approved)
+
+            coalition = members[:t]
+            for i in approved:
+                verdict = None
+                if use_bounds and class_bounds[i] is not None:
+                    verdict = _classify(t, class_bounds[i], gaps, i)
+
+                if verdict is not None:
+                    pruned += 1
+                    if verdict == "unchanged":
+                        stats["possible"] += mult
+                    continue
+
+                new_out = normalize_outcome(rule(elec.drop_approvals(coalition, i, winners[i])))
+                evaluated += 1
+
+                if new_out.winners[i] != winners[i]:
+                    continue
+                stats["possible"] += mult
+                new_u = int(sum(truthful[offsets[j] + new_out.winners[j]] for j in range(n_issues)))
+                if new_u > base_u:
+                    stats["successes"] += mult
+                elif new_u < base_u:
+                    stats["harms"] += mult
+
+    for stats in by_size.values():
+        trials, possible = stats["trials"], stats["possible"]
+        stats["success_rate"] = stats["successes"] / trials if trials else 0.0
+        stats["harm_rate"] = stats["harms"] / trials if trials else 0.0
+        stats["risk"] = stats["harms"] / possible if possible else 0.0
+
+    return {"by_size": by_size, "evaluated": evaluated, "pruned": pruned}
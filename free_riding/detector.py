@@ -14,13 +14,14 @@ def normalize_outcome(out) -> Outcome:
 
 def voter_utility_truthful(elec: MultiIssueElection, outcome: Outcome, voter: int) -> int:
     """Utility of voter under the *truthful* ballot (count approved winners)."""
+    row = elec.voter_row(voter)
     score = 0
     for i, w in enumerate(outcome.winners):
-        score += elec.approvals[voter, i, w]
+        score += row[elec.column(i, w)]
     return int(score)
 
 
-def detect_free_riding(elec: MultiIssueElection, rule) -> dict:
+def detect_free_riding(elec: MultiIssueElection, rule, return_outcomes: bool = False) -> dict:
     """
     Detect free-riding following the paper + Oliviero’s clarifications.
 
@@ -37,16 +38,21 @@ def detect_free_riding(elec: MultiIssueElection, rule) -> dict:
       eligible (# approved the original winner on that issue),
       possible (# non-pivotal manipulations),
       successes, harms.
+    With return_outcomes=True the result also holds "outcomes", an array of
+    shape (possible, n_issues) with the winners of every non-pivotal
+    manipulation, and "manipulations", the matching (voter, issue) pairs.
     """
     baseline = normalize_outcome(rule(elec))
 
-    n_voters, n_issues, _ = elec.approvals.shape
+    n_voters, n_issues = elec.n_voters, elec.n_issues
     trials = n_voters * n_issues
 
     eligible = 0
     possible = 0
     successes = 0
     harms = 0
+    outcomes = []
+    manipulations = []
 
     # Precompute truthful utilities vs baseline for all voters
     base_utils = [voter_utility_truthful(elec, baseline, v) for v in range(n_voters)]
@@ -56,14 +62,12 @@ def detect_free_riding(elec: MultiIssueElection, rule) -> dict:
             orig_winner = baseline.winners[i]
 
             # Only consider if voter approved the original winner on this issue
-            if elec.approvals[v, i, orig_winner] != 1:
+            if not elec.approves(v, i, orig_winner):
                 continue
             eligible += 1
 
             # Build manipulated election: identical except drop that single approval
-            approvals_new = elec.approvals.copy()
-            approvals_new[v, i, orig_winner] = 0  # drop only this approval
-            new_elec = MultiIssueElection(approvals_new)
+            new_elec = elec.drop_approvals(v, i, orig_winner)  # drop only this approval
 
             new_out = normalize_outcome(rule(new_elec))
 
@@ -71,6 +75,9 @@ def detect_free_riding(elec: MultiIssueElection, rule) -> dict:
             if new_out.winners[i] != orig_winner:
                 continue
             possible += 1
+            if return_outcomes:
+                outcomes.append(new_out.winners)
+                manipulations.append((v, i))
 
             # Evaluate effect using the truthful ballot
             new_util = voter_utility_truthful(elec, new_out, v)
@@ -80,10 +87,14 @@ def detect_free_riding(elec: MultiIssueElection, rule) -> dict:
                 harms += 1
             # else Δu==0 → neither success nor harm
 
-    return {
+    result = {
         "trials": trials,
         "eligible": eligible,
         "possible": possible,
         "successes": successes,
         "harms": harms,
     }
+    if return_outcomes:
+        result["outcomes"] = np.asarray(outcomes, dtype=np.int64).reshape(-1, n_issues)
+        result["manipulations"] = manipulations
+    return result
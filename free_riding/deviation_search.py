@@ -0,0 +1,126 @@
+# File: free_riding/deviation_search.py
+# Multi-issue free-riding for a single voter: the voter may drop their
+# approval of the original winner on several issues at once.
+#
+# The search runs over subsets of the voter's approved winners with
+# branch-and-bound, using the sequential structure of the rules: the winners
+# of issues up to the last dropped approval do not depend on approvals that
+# are dropped later. Hence
+#   • once a subset is pivotal (a dropped issue changes its winner), every
+#     extension with later issues is pivotal too, and
+#   • the voter's utility on issues up to that point is fixed for all
+#     extensions, which bounds the gain any extension can achieve.
+
+from typing import List, Optional, Tuple
+import numpy as np
+
+from core.types import MultiIssueElection
+from free_riding.detector import normalize_outcome
+
+
+def _utility(truthful: np.ndarray, offsets: np.ndarray, winners, upto: Optional[int] = None) -> int:
+    """Truthful utility of one voter (`truthful` is their row of `elec.columns`)."""
+    issues = range(len(winners) if upto is None else upto)
+    return int(sum(truthful[offsets[i] + winners[i]] for i in issues))
+
+
+def best_deviation(
+    elec: MultiIssueElection,
+    rule,
+    voter: int,
+    baseline=None,
+    max_drops: Optional[int] = None,
+) -> dict:
+    """
+    Best multi-issue free-riding deviation of one voter.
+
+    A deviation drops the voter's approval of the original winner on a set S
+    of issues (all other approvals truthful). It is admissible only if the
+    winner of every issue in S stays unchanged (non-pivotal). Its value is
+      Δu = u_truthful(new_out) - u_truthful(baseline_out).
+    The empty deviation (Δu = 0) is always admissible.
+
+    Assumes a sequential rule: the winner of issue i depends only on the
+    approvals on issues 1..i.
+
+    Returns
+    -------
+    dict with
+      gain    : best achievable Δu (>= 0)
+      dropped : issues of a best deviation (shortest first-found; () if none gains)
+      nodes   : number of manipulated elections evaluated
+    """
+    if baseline is None:
+        baseline = rule(elec)
+    base_winners = list(normalize_outcome(baseline).winners)
+    n_issues = elec.n_issues
+
+    offsets = elec.column_offsets
+    truthful = np.array(elec.voter_row(voter))
+    base_u = _utility(truthful, offsets, base_winners)
+    approved = [i for i in range(n_issues) if truthful[offsets[i] + base_winners[i]] == 1]
+    if max_drops is None:
+        max_drops = len(approved)
+
+    # reach[j] = max utility obtainable on issues j..k-1 (issues where v approves anyone)
+    can_gain = np.maximum.reduceat(truthful, offsets[:-1]) > 0
+    reach = np.concatenate([np.cumsum(can_gain[::-1])[::-1], [0]]).astype(int)
+
+    best = {"gain": 0, "dropped": ()}
+    nodes = 0
+
+    def visit(dropped: List[int], winners: List[int], start: int, current):
+        nonlocal nodes
+        for pos in range(start, len(approved)):
+            i = approved[pos]
+            # Issues before i are decided as in `winners`; i must keep its winner
+            # (approved by the voter); everything after is at most `reach`.
+            bound = _utility(truthful, offsets, winners, upto=i) + 1 + reach[i + 1] - base_u
+            if bound <= best["gain"]:
+                continue
+
+            manipulated = current.drop_approvals(voter, i, base_winners[i])
+            new_winners = list(normalize_outcome(rule(manipulated)).winners)
+            nodes += 1
+            subset = dropped + [i]
+
+            if all(new_winners[j] == base_winners[j] for j in subset):
+                gain = _utility(truthful, offsets, new_winners) - base_u
+                if gain > best["gain"]:
+                    best["gain"] = gain
+                    best["dropped"] = tuple(subset)
+                if len(subset) < max_drops:
+                    visit(subset, new_winners, pos + 1, manipulated)
+            # else: pivotal, and so is every extension with later issues
+
+    visit([], base_winners, 0, elec)
+    return {"gain": best["gain"], "dropped": best["dropped"], "nodes": nodes}
+
+
+def search_deviations(elec: MultiIssueElection, rule, max_drops: Optional[int] = None) -> dict:
+    """
+    Run `best_deviation` for every voter.
+
+    Returns:
+      best_gain    : np.ndarray (n_voters,) of best achievable Δu per voter
+      best_dropped : list of the corresponding dropped-issue tuples
+      gaining      : # voters with a profitable multi-issue deviation
+      nodes        : total manipulated elections evaluated
+    """
+    baseline = normalize_outcome(rule(elec))
+
+    gains = np.zeros(elec.n_voters, dtype=int)
+    dropped: List[Tuple[int, ...]] = []
+    nodes = 0
+    for v in range(elec.n_voters):
+        res = best_deviation(elec, rule, v, baseline=baseline, max_drops=max_drops)
+        gains[v] = res["gain"]
+        dropped.append(res["dropped"])
+        nodes += res["nodes"]
+
+    return {
+        "best_gain": gains,
+        "best_dropped": dropped,
+        "gaining": int((gains > 0).sum()),
+        "nodes": nodes,
+    }
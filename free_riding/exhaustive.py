@@ -0,0 +1,266 @@
+# File: free_riding/exhaustive.py
+# Exact worst- and average-case free-riding over *all* approval profiles of a
+# small instance (n voters, k issues, m_i candidates per issue).
+#
+# A ballot is a 0/1 vector over all candidate columns, encoded as an integer
+# bit mask (bit c = column c). Three reductions make the enumeration feasible:
+#   • Voter symmetry. The rules are anonymous, so a profile is a multiset of
+#     ballots; multisets are enumerated directly as sorted ballot tuples and
+#     stand for n! / prod(multiplicity!) ordered profiles.
+#   • Ballot classes. Voters with the same ballot have the same free-riding
+#     options, so the single-approval manipulations are evaluated once per
+#     distinct ballot and counted with its multiplicity.
+#   • Caching. A manipulated profile (one approval dropped) is again a
+#     multiset of the space, so rule outcomes are cached per multiset and
+#     shared between the representative profiles.
+# Candidate relabelling within an issue is a further symmetry only if ties are
+# broken neutrally; the rules break ties towards the lowest index, so it is
+# opt-in (`candidate_symmetry=True`). It saves rule evaluations, not
+# enumeration (every multiset is still visited to find the canonical ones),
+# and its results are approximate: an orbit is exact only if its
+# representative's elections are tie-free. The report says how many profiles
+# are covered by orbits where that is not known to hold.
+
+from itertools import combinations_with_replacement, permutations, product
+from math import comb, factorial, prod
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+import numpy as np
+
+from core.types import MultiIssueElection
+from free_riding.detector import normalize_outcome
+
+Profile = Tuple[int, ...]
+
+METRICS = ["success_rate", "harm_rate", "risk"]
+
+
+def _ballot_bits(offsets: np.ndarray) -> np.ndarray:
+    """(2^T, T) 0/1 matrix: row b is the ballot with bit mask b."""
+    total = int(offsets[-1])
+    masks = np.arange(2 ** total)
+    return ((masks[:, None] >> np.arange(total)) & 1).astype(np.int64)
+
+
+def _candidate_relabelings(offsets: np.ndarray) -> np.ndarray:
+    """
+    (G, 2^T) table: entry [g, b] is ballot b after the g-th relabelling of the
+    candidates within every issue (all combinations of per-issue permutations).
+    """
+    total = int(offsets[-1])
+    per_issue = [list(permutations(range(offsets[i], offsets[i + 1]))) for i in range(len(offsets) - 1)]
+    masks = np.arange(2 ** total)
+    tables = []
+    for choice in product(*per_issue):
+        target = np.concatenate([np.asarray(p) for p in choice])  # column c -> target[c]
+        image = np.zeros_like(masks)
+        for c in range(total):
+            image |= ((masks >> c) & 1) << target[c]
+        tables.append(image)
+    return np.array(tables)
+
+
+def _multinomial(profile: Profile) -> int:
+    """Ordered profiles (voter-labelled ballot assignments) of one multiset."""
+    _, mult = np.unique(profile, return_counts=True)
+    return factorial(len(profile)) // prod(factorial(int(c)) for c in mult)
+
+
+def count_profiles(n_voters: int, candidates_per_issue: Sequence[int]) -> int:
+    """Number of ballot multisets (profiles up to voter permutation)."""
+    return comb(2 ** int(sum(candidates_per_issue)) + n_voters - 1, n_voters)
+
+
+def enumerate_profiles(
+    n_voters: int,
+    candidates_per_issue: Sequence[int],
+    candidate_symmetry: bool = False,
+) -> Iterator[Tuple[Profile, int]]:
+    """
+    Yield (profile, weight): one sorted ballot tuple per orbit and the number of
+    ordered profiles (voter-labelled ballot assignments) it stands for. The
+    weights add up to (2^T)^n.
+    """
+    offsets = np.concatenate([[0], np.cumsum(candidates_per_issue)]).astype(np.int64)
+    n_ballots = 2 ** int(offsets[-1])
+    relabel = _candidate_relabelings(offsets) if candidate_symmetry else None
+
+    for profile in combinations_with_replacement(range(n_ballots), n_voters):
+        weight = _multinomial(profile)
+        if relabel is not None:
+            images = np.sort(relabel[:, list(profile)], axis=1)
+            images = np.unique(images, axis=0)  # rows in lexicographic order
+            if tuple(images[0]) != profile:
+                continue  # not the canonical (smallest) member of its orbit
+            weight *= len(images)
+        yield profile, weight
+
+
+class _OutcomeCache:
+    """Winners of a rule per ballot multiset, and whether any issue was tied."""
+
+    def __init__(self, rule, bits: np.ndarray, offsets: np.ndarray):
+        self.rule = rule
+        self.bits = bits
+        self.offsets = offsets
+        self.winners: Dict[Profile, Tuple[int, ...]] = {}
+        self.tied: Dict[Profile, bool] = {}
+        self.misses = 0
+
+    def election(self, profile: Profile) -> MultiIssueElection:
+        columns = self.bits[list(profile)]
+        cuts = self.offsets[1:-1]
+        return MultiIssueElection.from_issues(np.split(columns, cuts, axis=1))
+
+    def __call__(self, profile: Profile) -> Tuple[int, ...]:
+        winners = self.winners.get(profile)
+        if winners is None:
+            self.misses += 1
+            elec = self.election(profile)
+            if hasattr(self.rule, "trace"):
+                out, scores = self.rule.trace(elec)
+                self.tied[profile] = any(_is_tied(np.asarray(sc, dtype=float)) for sc in scores)
+            else:
+                out = self.rule(elec)
+                self.tied[profile] = True  # unknown, so not assumed tie-free
+            winners = tuple(int(w) for w in normalize_outcome(out).winners)
+            self.winners[profile] = winners
+        return winners
+
+
+def _is_tied(scores: np.ndarray) -> bool:
+    """Whether the best score is (within rounding) shared by another candidate."""
+    if len(scores) < 2:
+        return False
+    top, second = np.sort(scores)[-2:][::-1]
+    return top - second <= 1e-9 * max(1.0, abs(top))
+
+
+def _profile_counts(profile: Profile, cache: _OutcomeCache) -> Dict[str, int]:
+    """
+    `detect_free_riding` counts of a profile, one evaluation per distinct ballot
+    and issue, plus `tied`: whether any election evaluated for it had a tie.
+    """
+    offsets, bits = cache.offsets, cache.bits
+    n_issues = len(offsets) - 1
+    winners = cache(profile)
+    tied = cache.tied[profile]
+    counts = {"trials": len(profile) * n_issues, "eligible": 0, "possible": 0, "successes": 0, "harms": 0}
+
+    ballots, mult = np.unique(profile, return_counts=True)
+    for ballot, c in zip(ballots.tolist(), mult.tolist()):
+        truthful = bits[ballot]
+        base_u = sum(int(truthful[offsets[i] + winners[i]]) for i in range(n_issues))
+        rest = list(profile)
+        rest.remove(ballot)
+        for i in range(n_issues):
+            col = int(offsets[i] + winners[i])
+            if not truthful[col]:
+                continue
+            counts["eligible"] += c
+            manipulated = tuple(sorted(rest + [ballot & ~(1 << col)]))
+            new_winners = cache(manipulated)
+            tied = tied or cache.tied[manipulated]
+            if new_winners[i] != winners[i]:
+                continue
+            counts["possible"] += c
+            new_u = sum(int(truthful[offsets[j] + new_winners[j]]) for j in range(n_issues))
+            if new_u > base_u:
+                counts["successes"] += c
+            elif new_u < base_u:
+                counts["harms"] += c
+    counts["tied"] = tied
+    return counts
+
+
+def _rates(counts: Dict[str, int]) -> Dict[str, float]:
+    trials, possible = counts["trials"], counts["possible"]
+    return {
+        "success_rate": counts["successes"] / trials if trials else 0.0,
+        "harm_rate": counts["harms"] / trials if trials else 0.0,
+        "risk": counts["harms"] / possible if possible else 0.0,
+    }
+
+
+def exhaustive_risk(
+    rules: Dict[str, object],
+    n_voters: int,
+    candidates_per_issue: Sequence[int],
+    candidate_symmetry: bool = False,
+    max_profiles: Optional[int] = 1_000_000,
+) -> Dict[str, Dict]:
+    """
+    Exact free-riding statistics of every rule over all approval profiles.
+
+    Parameters
+    ----------
+    rules : dict
+        name -> rule (callable on elections).
+    n_voters : int
+    candidates_per_issue : list of int
+    candidate_symmetry : bool
+        Also reduce by relabelling candidates within issues (see module notes;
+        the results are then approximate unless `exact` is True).
+    max_profiles : int or None
+        Refuse instances with more ballot multisets than this.
+
+    Returns
+    -------
+    dict name -> {
+      profiles  : number of ordered profiles covered ((2^T)^n),
+      orbits    : number of representative profiles analysed,
+      evaluated : number of distinct profiles the rule was run on,
+      worst     : {metric: maximum over all profiles},
+      worst_profile : {metric: MultiIssueElection attaining it},
+      average   : {metric: mean over all ordered profiles (uniform, i.e. IC with p = 1/2)},
+      exact     : whether worst and average are exact,
+      inexact_profiles : ordered profiles counted through a relabelling of
+                  their orbit's representative whose elections had ties (or
+                  whose rule exposes no `trace`), for which the counted values
+                  may differ from their own; the representative's own orderings
+                  are evaluated exactly and never included,
+    } for metric in success_rate, harm_rate, risk (as in `evaluate_risk`).
+    Without candidate_symmetry every profile is counted exactly.
+    """
+    n_multisets = count_profiles(n_voters, candidates_per_issue)
+    if max_profiles is not None and n_multisets > max_profiles:
+        raise ValueError(
+            f"{n_multisets} profiles (up to voter order) exceed max_profiles={max_profiles}"
+        )
+
+    offsets = np.concatenate([[0], np.cumsum(candidates_per_issue)]).astype(np.int64)
+    bits = _ballot_bits(offsets)
+    caches = {name: _OutcomeCache(rule, bits, offsets) for name, rule in rules.items()}
+    worst = {name: {m: (-1.0, None) for m in METRICS} for name in rules}
+    totals = {name: dict.fromkeys(METRICS, 0.0) for name in rules}
+    inexact = dict.fromkeys(rules, 0)
+    covered = 0
+    orbits = 0
+
+    for profile, weight in enumerate_profiles(n_voters, candidates_per_issue, candidate_symmetry):
+        covered += weight
+        orbits += 1
+        # ordered profiles of the orbit other than those of the representative
+        relabelled = weight - _multinomial(profile) if candidate_symmetry else 0
+        for name, cache in caches.items():
+            counts = _profile_counts(profile, cache)
+            if counts["tied"]:
+                inexact[name] += relabelled
+            rates = _rates(counts)
+            for m in METRICS:
+                totals[name][m] += weight * rates[m]
+                if rates[m] > worst[name][m][0]:
+                    worst[name][m] = (rates[m], profile)
+
+    report = {}
+    for name, cache in caches.items():
+        report[name] = {
+            "profiles": covered,
+            "orbits": orbits,
+            "evaluated": cache.misses,
+            "worst": {m: worst[name][m][0] for m in METRICS},
+            "worst_profile": {m: cache.election(worst[name][m][1]) for m in METRICS},
+            "average": {m: totals[name][m] / covered for m in METRICS},
+            "exact": inexact[name] == 0,
+            "inexact_profiles": inexact[name],
+        }
+    return report
@@ -1,5 +1,6 @@
 # File: free_riding/welfare.py
-from core.types import MultiIssueElection, Outcome, utilitarian_welfare, egalitarian_welfare, nash_welfare
+import numpy as np
+from core.types import MultiIssueElection, Outcome, batch_welfare
 
 
 def welfare_summary(elec: MultiIssueElection, winners) -> dict:
@@ -23,14 +24,46 @@ def welfare_summary(elec: MultiIssueElection, winners) -> dict:
             "nash": float
         }
     """
-    # Normalize winners into Outcome
+    # Normalize winners into a list; all three metrics come from one gather
     if isinstance(winners, Outcome):
-        outcome = winners
-    else:
-        outcome = Outcome(winners=list(winners))
-
-    return {
-        "utilitarian": utilitarian_welfare(elec, outcome),
-        "egalitarian": egalitarian_welfare(elec, outcome),
-        "nash": nash_welfare(elec, outcome),
-    }
+        winners = winners.winners
+    welfare = batch_welfare(elec, [list(winners)])
+    return {name: float(values[0]) for name, values in welfare.items()}
+
+
+def welfare_summary_batch(elec: MultiIssueElection, winners) -> dict:
+    """
+    Batch variant of `welfare_summary`.
+
+    Parameters
+    ----------
+    elec : MultiIssueElection
+        The election instance with voter approvals.
+    winners : array-like of shape (B, n_issues), or a list of Outcome objects
+        One outcome per row.
+
+    Returns
+    -------
+    dict
+        {
+            "utilitarian": np.ndarray (B,),
+            "egalitarian": np.ndarray (B,),
+            "nash": np.ndarray (B,)
+        }
+    """
+    if len(winners) and isinstance(winners[0], Outcome):
+        winners = [o.winners for o in winners]
+    winners = np.asarray(winners, dtype=np.int64).reshape(-1, elec.n_issues)
+    return batch_welfare(elec, winners)
+
+
+def welfare_deltas(elec: MultiIssueElection, baseline, winners) -> dict:
+    """
+    Welfare change of every outcome in `winners` relative to `baseline`.
+
+    Typical use: the manipulated outcomes collected by
+    `detect_free_riding(elec, rule, return_outcomes=True)`.
+    """
+    base = welfare_summary(elec, baseline)
+    batch = welfare_summary_batch(elec, winners)
+    return {key: batch[key] - base[key] for key in batch}
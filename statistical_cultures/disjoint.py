@@ -21,5 +21,4 @@ def sample_disjoint(cfg: DisjointConfig) -> MultiIssueElection:
             fav = rng.integers(0, m)
             issue_matrix[start:end, fav] = rng.binomial(1, cfg.p, size=(group_size,))
         approvals.append(issue_matrix)
-    approvals = np.stack(approvals, axis=1)
-    return MultiIssueElection(approvals)
+    return MultiIssueElection.from_issues(approvals)
@@ -21,13 +21,78 @@ class HammingConfig:
     seed: int = None            # random seed
 
 
-def add_hamming_noise(elec: MultiIssueElection, noise_prob: float, seed=None) -> MultiIssueElection:
-    """Flip each approval with probability `noise_prob`."""
+# Above this flip probability one uniform draw per approval is cheaper than
+# drawing the gaps between flips
+DENSE_NOISE = 0.25
+
+
+def flip_positions(rng: np.random.Generator, size: int, noise_prob: float) -> np.ndarray:
+    """
+    Sorted flat indices in [0, size) to flip, each independently with
+    probability `noise_prob`.
+
+    For small probabilities only the flips are sampled: the gaps between
+    consecutive flips are geometric, so drawing them costs O(noise_prob * size)
+    instead of one draw per approval.
+    """
+    if not 0.0 <= noise_prob <= 1.0:
+        raise ValueError(f"noise_prob must be in [0, 1]; got {noise_prob}")
+    if noise_prob == 0.0 or size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if noise_prob >= DENSE_NOISE:
+        return np.flatnonzero(rng.random(size) < noise_prob)
+
+    parts = []
+    last = -1
+    while True:
+        # a few standard deviations above the expected number of remaining flips
+        mean = (size - 1 - last) * noise_prob
+        gaps = rng.geometric(noise_prob, size=int(mean + 4 * np.sqrt(mean)) + 16)
+        positions = last + np.cumsum(gaps)
+        if positions[-1] >= size:
+            parts.append(positions[:np.searchsorted(positions, size)])
+            return np.concatenate(parts)
+        parts.append(positions)
+        last = int(positions[-1])
+
+
+def add_hamming_noise(elec: MultiIssueElection, noise_prob: float, seed=None,
+                      inplace: bool = False) -> MultiIssueElection:
+    """
+    Flip each approval with probability `noise_prob`.
+
+    Only the flipped positions are sampled (see `flip_positions`) and applied
+    with XOR, so the approvals keep their dtype (bool and int8 profiles stay
+    compact). With `inplace=True` the approvals of `elec` are modified instead
+    of a copy.
+    """
     rng = np.random.default_rng(seed)
-    noisy = elec.approvals.copy()
-    flips = rng.binomial(1, noise_prob, size=noisy.shape)
-    noisy = np.abs(noisy - flips)
-    return MultiIssueElection(noisy)
+    if inplace and not elec.approvals.flags.c_contiguous:
+        raise ValueError("inplace noise needs C-contiguous approvals")
+    noisy = elec.approvals if inplace else elec.approvals.copy()
+    flat = noisy.reshape(-1)
+    flat[flip_positions(rng, flat.size, noise_prob)] ^= noisy.dtype.type(1)
+    return MultiIssueElection(noisy, elec.offsets)
+
+
+def add_hamming_noise_batch(elec: MultiIssueElection, noise_prob: float, seeds) -> List[MultiIssueElection]:
+    """
+    `add_hamming_noise(elec, noise_prob, seed)` for every seed in `seeds`.
+
+    The noisy profiles are views into one (len(seeds), ...) array filled in a
+    single copy, and the flips of all seeds are applied in a single XOR.
+    """
+    seeds = list(seeds)
+    stack = np.empty((len(seeds),) + elec.approvals.shape, dtype=elec.approvals.dtype)
+    stack[...] = elec.approvals
+    size = elec.approvals.size
+    positions = [
+        flip_positions(np.random.default_rng(seed), size, noise_prob) + b * size
+        for b, seed in enumerate(seeds)
+    ]
+    if positions:
+        stack.reshape(-1)[np.concatenate(positions)] ^= stack.dtype.type(1)
+    return [MultiIssueElection(stack[b], elec.offsets) for b in range(len(seeds))]
 
 
 def sample_hamming(cfg: HammingConfig) -> MultiIssueElection:
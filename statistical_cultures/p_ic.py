@@ -15,5 +15,4 @@ def sample_p_ic(cfg: PICConfig) -> MultiIssueElection:
     for m in cfg.candidates_per_issue:
         issue_matrix = rng.binomial(1, cfg.p, size=(cfg.n_voters, m))
         approvals.append(issue_matrix)
-    approvals = np.stack(approvals, axis=1)
-    return MultiIssueElection(approvals)
+    return MultiIssueElection.from_issues(approvals)
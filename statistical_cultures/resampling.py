@@ -23,5 +23,5 @@ def sample_resampling(cfg: ResamplingConfig) -> MultiIssueElection:
             issue_pref = np.where(mask == 1, base, rng.binomial(1, cfg.p, size=base.shape))
             voter.append(issue_pref)
         approvals.append(voter)
-    approvals = np.array(approvals)
-    return MultiIssueElection(approvals)
+    issue_matrices = [np.array([voter[i] for voter in approvals]) for i in range(len(base_pref))]
+    return MultiIssueElection.from_issues(issue_matrices)
@@ -0,0 +1,83 @@
+# File: tests/test_cube.py
+import numpy as np
+import pandas as pd
+
+from experiments.cube import add_risk_column, build_cube, build_cube_from_files, curves, rollup, slices, summary_table, sweep_label
+from experiments.run_experiments import run_batch, summarize_results
+
+
+def _rows():
+    return pd.concat([
+        run_batch(culture, rule, n_voters=5, issues=2, cands=2, seeds=4)
+        for culture in ["p_ic", "disjoint"]
+        for rule in ["utilitarian", "thiele_x1", "owa_x1", "owa_leximin"]
+    ], ignore_index=True)
+
+
+def test_cube_from_rows_matches_summaries(tmp_path):
+    rows = _rows()
+    path = tmp_path / "rows.csv"
+    rows.to_csv(path, index=False)
+    cube = build_cube_from_files([str(path)], chunksize=7)
+
+    summaries = pd.concat(
+        [summarize_results(g) for _, g in rows.groupby(["culture", "rule"], sort=False)],
+        ignore_index=True,
+    )
+    table = summary_table(cube)
+    assert list(table["rule"][:4]) == ["utilitarian", "thiele_x1", "owa_x1", "owa_leximin"]
+    assert list(table["seeds"]) == [4] * 8
+    np.testing.assert_allclose(table["risk"], summaries["risk"])
+
+    # Summaries weighted by their seeds give the same cube as the rows
+    np.testing.assert_allclose(summary_table(build_cube([summaries]))["harm_rate"], table["harm_rate"])
+
+    thiele = cube[cube["family"] == "thiele"]
+    assert list(thiele["param"]) == [1, 1]
+    assert cube[cube["rule"] == "utilitarian"]["param"].isna().all()
+
+
+def test_rollup_weights_by_seeds_and_keeps_missing_keys():
+    cube = pd.DataFrame({
+        "culture": ["p_ic", "p_ic"], "rule": ["utilitarian"] * 2,
+        "p": [0.2, 0.4], "seeds": [1, 3], "risk": [0.0, 1.0],
+    })
+    cube = build_cube([cube])
+    out = rollup(cube, ["culture", "family", "param"])
+    assert len(out) == 1
+    assert out["seeds"].iloc[0] == 4
+    assert out["risk"].iloc[0] == 0.75
+
+
+def test_add_risk_column_is_vectorised_fallback():
+    df = add_risk_column(pd.DataFrame({"successes": [0, 2], "harms": [1, 1]}))
+    assert list(df["risk"]) == [0.0, 0.5]
+
+
+def test_curves_keep_sweep_points_apart():
+    cube = build_cube([pd.DataFrame({
+        "culture": ["p_ic"] * 5 + ["disjoint"], "rule": ["utilitarian", "owa_x1"] * 2 + ["owa_x1"] * 2,
+        "n_voters": [10, 10, 10, 10, 20, 10], "p": [0.4, 0.4, 0.2, 0.2, 0.3, None],
+        "seeds": 1, "risk": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+    })])
+    points = [point for point, _ in slices(cube, ["culture", "n_voters", "p"])]
+    assert {"culture": "disjoint", "n_voters": 10} in points and len(points) == 4
+
+    found = list(curves(cube, "p"))
+    assert len(found) == 1  # n_voters=20 has a single p, disjoint has none
+    point, rows = found[0]
+    assert point == {"culture": "p_ic", "n_voters": 10}
+    assert list(rows["p"]) == [0.2, 0.2, 0.4, 0.4]
+    assert list(rows[rows["rule"] == "owa_x1"]["risk"]) == [0.4, 0.2]
+
+
+def test_sweep_label_names_only_varying_parameters():
+    combined = build_cube([_rows()])  # `--batch all` summary: no sweep columns
+    assert {sweep_label(combined, point) for point, _ in slices(combined, ["culture"])} == {""}
+
+    cube = build_cube([pd.DataFrame({
+        "culture": ["p_ic", "p_ic", "disjoint"], "rule": ["owa_x1"] * 3,
+        "n_voters": [10, 20, 10], "p": [0.3, 0.3, None], "seeds": 1, "risk": 0.0,
+    })])
+    labels = [sweep_label(cube, point) for point, _ in slices(cube, ["culture", "n_voters", "p"])]
+    assert labels == ["n_voters10", "n_voters20", ""]
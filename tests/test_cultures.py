@@ -1,8 +1,13 @@
 # File: tests/test_cultures.py
+import numpy as np
+
 from statistical_cultures.p_ic import PICConfig, sample_p_ic
 from statistical_cultures.resampling import ResamplingConfig, sample_resampling
 from statistical_cultures.disjoint import DisjointConfig, sample_disjoint
-from statistical_cultures.hamming_noise import HammingConfig, sample_hamming
+from statistical_cultures.hamming_noise import (
+    HammingConfig, sample_hamming, add_hamming_noise, add_hamming_noise_batch, flip_positions,
+)
+from core.types import MultiIssueElection
 
 
 def test_p_ic_sampling():
@@ -27,3 +32,33 @@ def test_hamming_sampling():
     cfg = HammingConfig(base="p_ic", n_voters=4, candidates_per_issue=[2, 2], p=0.5, noise_prob=0.2, seed=4)
     elec = sample_hamming(cfg)
     assert elec.approvals.shape == (4, 2, 2)
+
+
+def test_ragged_candidate_sets():
+    cfg = PICConfig(n_voters=4, candidates_per_issue=[2, 5, 3], p=0.5, seed=5)
+    elec = sample_p_ic(cfg)
+    assert elec.is_ragged
+    assert elec.approvals.shape == (4, 10)
+    assert list(elec.candidate_counts) == [2, 5, 3]
+    assert elec.issue(1).shape == (4, 5)
+
+
+def test_hamming_noise_flips_and_batch():
+    elec = sample_p_ic(PICConfig(n_voters=400, candidates_per_issue=[3, 4], seed=7))
+    for prob in (0.0, 0.02, 0.5, 1.0):
+        noisy = add_hamming_noise(elec, prob, seed=3)
+        changed = np.mean(noisy.approvals != elec.approvals)
+        assert abs(changed - prob) < 0.03
+        assert noisy.approvals.dtype == elec.approvals.dtype and noisy.offsets is elec.offsets
+
+    positions = flip_positions(np.random.default_rng(0), 10**6, 0.001)
+    assert np.all(np.diff(positions) > 0) and positions[-1] < 10**6
+    assert abs(len(positions) - 1000) < 150
+
+    batch = add_hamming_noise_batch(elec, 0.05, [1, 2, 3])
+    for seed, noisy in zip([1, 2, 3], batch):
+        assert np.array_equal(noisy.approvals, add_hamming_noise(elec, 0.05, seed=seed).approvals)
+
+    compact = elec.approvals.astype(bool)
+    add_hamming_noise(MultiIssueElection(compact, elec.offsets), 0.1, seed=3, inplace=True)
+    assert np.array_equal(compact, add_hamming_noise(elec, 0.1, seed=3).approvals.astype(bool))
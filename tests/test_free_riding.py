@@ -1,8 +1,22 @@
 # File: tests/test_free_riding.py
+import itertools
+
+import numpy as np
+import pytest
+
 from statistical_cultures.p_ic import PICConfig, sample_p_ic
 from free_riding.detector import detect_free_riding
 from free_riding.risk import evaluate_risk
 from voting_rules.utilitarian import sequential_utilitarian
+from free_riding.welfare import welfare_summary, welfare_summary_batch, welfare_deltas
+from voting_rules.sequential_thiele import ThieleRule
+from core.types import nash_welfare, Outcome, MultiIssueElection
+from free_riding.deviation_search import search_deviations
+from statistical_cultures.disjoint import DisjointConfig, sample_disjoint
+from free_riding.coalitions import detect_coalitional_free_riding
+from voting_rules.owa import OWARule
+from free_riding.exhaustive import exhaustive_risk, enumerate_profiles, _OutcomeCache, _ballot_bits, _multinomial, _profile_counts
+
 
 def test_detector_and_risk():
     cfg = PICConfig(n_voters=4, candidates_per_issue=[2, 2], seed=2)
@@ -18,3 +32,98 @@ def test_detector_and_risk():
     assert "harm_rate" in risk
     assert risk["trials"] == res["trials"]
     assert risk["successes"] == res["successes"]
+
+
+def test_batch_welfare_matches_single_outcomes():
+    cfg = PICConfig(n_voters=8, candidates_per_issue=[3, 3, 3], seed=5)
+    elec = sample_p_ic(cfg)
+    rule = ThieleRule(1)
+
+    res = detect_free_riding(elec, rule, return_outcomes=True)
+    assert res["outcomes"].shape == (res["possible"], 3)
+
+    batch = welfare_summary_batch(elec, res["outcomes"])
+    for b, winners in enumerate(res["outcomes"]):
+        single = welfare_summary(elec, list(winners))
+        for key in ("utilitarian", "egalitarian", "nash"):
+            assert np.isclose(batch[key][b], single[key])
+
+    deltas = welfare_deltas(elec, rule(elec), res["outcomes"])
+    assert deltas["utilitarian"].shape == (res["possible"],)
+
+
+def test_nash_welfare_large_electorate_is_finite():
+    cfg = PICConfig(n_voters=5000, candidates_per_issue=[2] * 20, p=0.9, seed=0)
+    elec = sample_p_ic(cfg)
+    value = nash_welfare(elec, Outcome(winners=[0] * 20))
+    assert np.isfinite(value) and value > 1.0
+
+
+def test_deviation_search_matches_exhaustive_subsets():
+    elec = sample_p_ic(PICConfig(n_voters=6, candidates_per_issue=[3, 3, 3], seed=7))
+    rule = ThieleRule(1)
+    base = rule(elec).winners
+
+    expected = []
+    for v in range(elec.n_voters):
+        truthful = elec.approvals[v]
+        base_u = sum(truthful[i, w] for i, w in enumerate(base))
+        approved = [i for i, w in enumerate(base) if truthful[i, w] == 1]
+        best = 0
+        for r in range(1, len(approved) + 1):
+            for subset in itertools.combinations(approved, r):
+                approvals = elec.approvals.copy()
+                for i in subset:
+                    approvals[v, i, base[i]] = 0
+                new = rule(MultiIssueElection(approvals)).winners
+                if all(new[i] == base[i] for i in subset):
+                    best = max(best, sum(truthful[i, w] for i, w in enumerate(new)) - base_u)
+        expected.append(best)
+
+    res = search_deviations(elec, rule)
+    assert list(res["best_gain"]) == expected
+    assert res["gaining"] == int(np.count_nonzero(expected))
+
+
+def test_coalitional_detector_pruning_is_exact():
+    elec = sample_disjoint(DisjointConfig(n_voters=12, candidates_per_issue=[3] * 4, n_groups=3, p=0.8, seed=1))
+    for rule in (sequential_utilitarian, ThieleRule(1), OWARule(2)):
+        pruned = detect_coalitional_free_riding(elec, rule, max_size=4)
+        full = detect_coalitional_free_riding(elec, rule, max_size=4, prune=False)
+        assert pruned["by_size"] == full["by_size"]
+
+        single = detect_free_riding(elec, rule)
+        for key, value in single.items():
+            assert pruned["by_size"][1][key] == value
+
+    # Thiele's later shifts are the voter's own weight steps, so most of this
+    # profile is settled by the bounds
+    elec = sample_disjoint(DisjointConfig(n_voters=20, candidates_per_issue=[4] * 5, n_groups=2, p=0.7, seed=0))
+    result = detect_coalitional_free_riding(elec, ThieleRule(1), max_size=2)
+    assert result["pruned"] > 4 * result["evaluated"]
+
+
+def test_exhaustive_enumeration_matches_detector():
+    offsets = np.array([0, 2, 4])
+    rule = OWARule(1)
+    cache = _OutcomeCache(rule, _ballot_bits(offsets), offsets)
+    profiles = list(enumerate_profiles(3, [2, 2]))
+    assert sum(w for _, w in profiles) == 16 ** 3
+    for profile, _ in profiles[::7]:
+        counts = _profile_counts(profile, cache)
+        single = detect_free_riding(cache.election(profile), rule)
+        assert all(counts[k] == single[k] for k in counts if k != "tied")
+
+    report = exhaustive_risk({"owa_x1": rule}, 3, [2, 2], candidate_symmetry=True)["owa_x1"]
+    assert report["profiles"] == 16 ** 3
+    assert report["orbits"] < len(profiles)
+    worst = report["worst_profile"]["success_rate"]
+    assert evaluate_risk(worst, rule)["success_rate"] == report["worst"]["success_rate"] > 0
+    # index tie-breaking is not neutral, so the reduced results are flagged
+    # ... counting only the relabelled orderings, not the representatives' own
+    own = sum(_multinomial(profile) for profile, _ in enumerate_profiles(3, [2, 2], True))
+    assert not report["exact"] and 0 < report["inexact_profiles"] <= report["profiles"] - own
+    assert exhaustive_risk({"owa_x1": rule}, 2, [2, 2])["owa_x1"]["exact"]
+
+    with pytest.raises(ValueError):
+        exhaustive_risk({"owa_x1": rule}, 6, [3, 3, 3])
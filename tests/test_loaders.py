@@ -0,0 +1,100 @@
+# File: tests/test_loaders.py
+import os
+
+import numpy as np
+import pytest
+
+from core import loaders
+from core.loaders import load_approval_csv, load_election, load_preflib, read_preflib
+from experiments.run_experiments import main
+from free_riding.risk import evaluate_risk
+from statistical_cultures.p_ic import PICConfig, sample_p_ic
+from voting_rules.sequential_thiele import ThieleRule
+
+
+def test_preflib_file_and_cache(tmp_path):
+    path = tmp_path / "votes.toi"
+    path.write_text("# CANDIDATES PER ISSUE: 3,2\n# NUMBER VOTERS: 5\n3: {1,2},{}\n2: {3},{1,2}\n")
+
+    elec = load_preflib(str(path))
+    assert elec.shape_key == (5, 2, (3, 2))
+    assert np.asarray(elec.columns).tolist() == [[1, 1, 0, 0, 0]] * 3 + [[0, 0, 1, 1, 1]] * 2
+    assert os.path.exists(str(path) + ".approvals.npy")
+
+    cached = load_election(str(path))
+    assert isinstance(cached.approvals, np.memmap)
+    assert evaluate_risk(cached, ThieleRule(1)) == evaluate_risk(elec, ThieleRule(1))
+
+    # Editing the source invalidates the cache
+    path.write_text("# CANDIDATES PER ISSUE: 3,2\n4: {1,2},{}\n")
+    assert load_preflib(str(path)).n_voters == 4
+
+    path.write_text("2: {1},{x}\n")
+    with pytest.raises(ValueError, match="integers"):
+        load_preflib(str(path), cache=False)
+
+
+def test_preflib_requires_one_comma_between_sets(tmp_path):
+    path = tmp_path / "votes.toi"
+    for body in ["{1}{2}", "{1},,{2}", "{1},", ",{1}"]:
+        line = f"1: {body}\n"
+        assert loaders._scan_preflib_chunk(np.frombuffer(line.encode(), dtype=np.uint8), 1, None) is None
+        path.write_text(line)
+        with pytest.raises(ValueError, match="malformed approval sets"):
+            read_preflib(str(path))
+
+    valid = "1: {1} , {2}\n2:{},{1,2}\n"
+    assert loaders._scan_preflib_chunk(np.frombuffer(valid.encode(), dtype=np.uint8), 2, None) is not None
+    path.write_text(valid)
+    columns, offsets = read_preflib(str(path))
+    assert columns.tolist() == [[1, 0, 1], [0, 1, 1], [0, 1, 1]] and offsets.tolist() == [0, 1, 3]
+
+
+def test_unwritable_cache_loads_uncached(tmp_path):
+    path = tmp_path / "votes.toi"
+    path.write_text("2: {1},{2}\n")
+    with pytest.warns(UserWarning, match="cannot write the cache"):
+        elec = load_preflib(str(path), cache_dir=str(path))  # a file, not a directory
+    assert elec.n_voters == 2 and not isinstance(elec.approvals, np.memmap)
+
+
+def test_preflib_chunks_match_line_parser(tmp_path, monkeypatch):
+    # Small chunks: the first holds the metadata, a later one a malformed line
+    monkeypatch.setattr(loaders, "PREFLIB_CHUNK_LINES", 3)
+    elec = sample_p_ic(PICConfig(n_voters=40, candidates_per_issue=[3, 4, 2], seed=2))
+    lines = ["%d: %s" % (1 + v % 2, ",".join(
+        "{%s}" % ", ".join(str(c + 1) for c in np.flatnonzero(elec.issue(i)[v])) for i in range(3)))
+        for v in range(40)]
+    path = tmp_path / "votes.toi"
+    path.write_text("# CANDIDATES PER ISSUE: 3,4,2\n\n" + "\n".join(lines) + "\n")
+
+    columns, offsets = read_preflib(str(path))
+    counts = 1 + np.arange(40) % 2
+    assert np.array_equal(columns, np.repeat(np.asarray(elec.columns, dtype=np.int8), counts, axis=0))
+    assert offsets.tolist() == [0, 3, 7, 9]
+
+    path.write_text("\n".join(lines[:7] + ["1: {1},{2,2},{}"]) + "\n")
+    with pytest.raises(ValueError, match=r"votes.toi:8: candidates must be distinct"):
+        read_preflib(str(path))
+
+
+def test_csv_dump_matches_sampled_profile(tmp_path):
+    elec = sample_p_ic(PICConfig(n_voters=50, candidates_per_issue=[3, 3, 2], seed=4))
+    header = ",".join(f"q{i}:{c}" for i, m in enumerate([3, 3, 2]) for c in range(m))
+    path = tmp_path / "ballots.csv"
+    with open(path, "w") as f:
+        f.write(header + "\n")
+        np.savetxt(f, np.asarray(elec.columns), fmt="%d", delimiter=",")
+
+    loaded = load_approval_csv(str(path), cache_dir=str(tmp_path / "cache"))
+    assert np.array_equal(np.asarray(loaded.columns), np.asarray(elec.columns))
+    assert ThieleRule(1)(loaded).winners == ThieleRule(1)(elec).winners
+
+    counted = tmp_path / "counted.csv"
+    counted.write_text("count,a:1,a:2,b:1\n2,1,0,1\n1,0,1,3\n")
+    with pytest.raises(ValueError, match="0 or 1"):
+        load_approval_csv(str(counted), cache=False)
+
+    # --data is a single profile; batch-style outputs are rejected up front
+    with pytest.raises(SystemExit):
+        main(["--data", str(path), "--rule", "owa_x1", "--summary"])
@@ -0,0 +1,21 @@
+# File: tests/test_plot_results.py
+import pandas as pd
+import pytest
+
+from experiments.cube import build_cube
+from experiments.run_experiments import run_batch
+
+pytest.importorskip("matplotlib")
+from experiments.plot_results import plot_risk_by_family  # noqa: E402
+
+
+def test_combined_summary_keeps_report_figure_names(tmp_path):
+    rows = pd.concat([
+        run_batch(culture, rule, n_voters=5, issues=2, cands=2, seeds=2)
+        for culture in ["p_ic", "disjoint"]
+        for rule in ["thiele_x1", "owa_x1"]
+    ], ignore_index=True)
+    plot_risk_by_family(build_cube([rows]), str(tmp_path))
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "risk_disjoint_owa.pdf", "risk_disjoint_thiele.pdf", "risk_p_ic_owa.pdf", "risk_p_ic_thiele.pdf",
+    ]
@@ -0,0 +1,26 @@
+# File: tests/test_registry.py
+import subprocess
+import sys
+from pathlib import Path
+
+from experiments.registry import get_rule, rule_names, sample_culture
+from core.types import Outcome
+
+
+def test_registry_rules_are_cached_and_callable():
+    elec = sample_culture("disjoint", 6, [3, 3], seed=0)
+    assert get_rule("thiele_x5") is get_rule("thiele_x5")
+    for name in rule_names(6):
+        assert isinstance(get_rule(name)(elec), Outcome)
+    assert "owa_x10" not in rule_names(6)
+
+
+def test_worker_does_not_import_pandas():
+    code = (
+        "import sys; from experiments.worker import run_cell; "
+        "run_cell(culture='p_ic', rule='owa_x1', n_voters=4, issues=2, cands=2, seeds=1); "
+        "print('pandas' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=Path(__file__).resolve().parents[1])
+    assert out.stdout.strip() == "False"
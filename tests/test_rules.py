@@ -1,9 +1,15 @@
 # File: tests/test_rules.py
+import pickle
+
+import numpy as np
+
 from statistical_cultures.p_ic import PICConfig, sample_p_ic
-from voting_rules.utilitarian import sequential_utilitarian
-from voting_rules.sequential_thiele import sequential_thiele
-from voting_rules.owa import owa_rule, leximin_owa
-from core.types import Outcome
+from voting_rules.utilitarian import sequential_utilitarian, UtilitarianRule
+from voting_rules.sequential_thiele import sequential_thiele, ThieleRule
+from voting_rules.owa import owa_rule, leximin_owa, OWARule, LeximinOWARule
+from core.types import Outcome, MultiIssueElection
+from experiments.registry import get_rule, rule_names
+from free_riding.risk import evaluate_risk
 
 
 def test_utilitarian_rule():
@@ -39,3 +45,56 @@ def test_owa_rules_parametric_and_leximin():
     assert isinstance(out2, Outcome)
     assert out1.winners
     assert out2.winners
+
+
+def test_rule_objects_match_functions_and_pickle():
+    cfg = PICConfig(n_voters=6, candidates_per_issue=[3, 3, 3], seed=4)
+    elec = sample_p_ic(cfg)
+
+    pairs = [
+        (UtilitarianRule(), sequential_utilitarian),
+        (ThieleRule(5), lambda e: sequential_thiele(e, x=5)),
+        (OWARule(3), lambda e: owa_rule(e, x=3)),
+        (LeximinOWARule(), leximin_owa),
+    ]
+    for rule, func in pairs:
+        assert rule(elec).winners == func(elec).winners
+        clone = pickle.loads(pickle.dumps(rule))
+        assert clone == rule and hash(clone) == hash(rule)
+        assert clone(elec).winners == rule(elec).winners
+
+    assert ThieleRule(1) != ThieleRule(5)
+    assert len({OWARule(1), OWARule(1), ThieleRule(1)}) == 2
+
+
+def test_ragged_election_matches_zero_padded_dense():
+    elec = sample_p_ic(PICConfig(n_voters=8, candidates_per_issue=[2, 6, 3], seed=6))
+    padded = MultiIssueElection(np.stack(
+        [np.pad(elec.issue(i), ((0, 0), (0, 6 - m))) for i, m in enumerate(elec.candidate_counts)],
+        axis=1,
+    ))
+
+    # Phantom (all-zero) candidates never win, so both layouts agree
+    for name in rule_names(8):
+        rule = get_rule(name)
+        assert rule(elec).winners == rule(padded).winners
+        assert evaluate_risk(elec, rule) == evaluate_risk(padded, rule)
+
+
+def test_chunked_engines_match_in_memory(tmp_path):
+    for cands in ([3, 3, 3, 3], [2, 4, 3]):
+        elec = sample_p_ic(PICConfig(n_voters=301, candidates_per_issue=cands, seed=8))
+        path = str(tmp_path / f"approvals{len(cands)}.npy")
+        np.save(path, elec.approvals.astype(np.int8))
+        mapped = MultiIssueElection(np.load(path, mmap_mode="r"), elec.offsets)
+
+        for name in rule_names(301):
+            rule = get_rule(name)
+            expected = rule(elec).winners
+            # memory-mapped elections use the chunked engine automatically
+            assert rule(mapped).winners == expected
+            assert rule.run_chunked(elec, chunk_voters=50).winners == expected
+            dense, chunked = [], []
+            rule._run(elec, rule.tables(elec), dense)
+            rule._run_chunked(elec, rule.tables(elec), chunked, chunk_voters=64)
+            assert all(np.array_equal(a, b) for a, b in zip(dense, chunked))
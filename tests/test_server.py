@@ -0,0 +1,93 @@
+# File: tests/test_server.py
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from experiments.registry import get_rule, sample_culture
+from experiments.server import EvaluationServer, Evaluator
+from free_riding.risk import evaluate_risk
+from free_riding.welfare import welfare_summary
+
+
+def _post(url, payload):
+    req = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as resp:
+        return json.load(resp)
+
+
+@pytest.fixture
+def server():
+    srv = EvaluationServer(port=0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d" % srv.server_address[1]
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_server_matches_direct_evaluation(server):
+    spec = {"culture": "p_ic", "n_voters": 8, "issues": 3, "cands": 3, "seed": 5}
+    rules = ["utilitarian", "thiele_x1", "owa_leximin"]
+    elec = sample_culture("p_ic", 8, [3, 3, 3], seed=5)
+
+    first = _post(server + "/evaluate", {"election": spec, "rules": rules})
+    again = _post(server + "/risk", {"election": spec, "rules": rules})
+    for name in rules:
+        winners = get_rule(name)(elec).winners
+        assert first["winners"][name] == winners
+        assert first["risk"][name] == evaluate_risk(elec, get_rule(name)) == again["risk"][name]
+        assert first["welfare"][name] == pytest.approx(welfare_summary(elec, winners))
+    assert set(again) == {"n_voters", "n_issues", "risk"}
+
+    # explicit tensors, ragged ones with offsets
+    tensor = _post(server + "/winners", {"election": {"approvals": elec.approvals.tolist()}, "rules": rules})
+    assert tensor["winners"] == first["winners"]
+    ragged = _post(server + "/winners", {"election": {"approvals": [[1, 0, 0, 1, 1], [0, 1, 1, 0, 0]],
+                                                      "offsets": [0, 2, 5]}})
+    assert ragged["winners"]["utilitarian"] == [0, 0]
+
+    with urllib.request.urlopen(server + "/health") as resp:
+        health = json.load(resp)
+    assert health["profiles"] == {"cached": 1, "hits": 1, "misses": 1}
+
+
+def test_server_errors(server):
+    for path, payload, status in [
+        ("/winners", {"election": {"culture": "nope"}}, 400),
+        ("/winners", {"election": {"approvals": [[[2, 0]]]}}, 400),
+        ("/winners", {"election": {"culture": "p_ic"}, "rules": ["borda"]}, 400),
+        ("/risk", {"election": {"culture": "p_ic", "n_voters": 8}, "rules": ["owa_x15"]}, 400),
+        ("/winners", {"election": {"culture": "disjoint", "groups": 0}}, 400),
+        ("/winners", {"election": {"culture": "p_ic", "n_voters": 10 ** 9}}, 400),
+        ("/unknown", {}, 404),
+    ]:
+        with pytest.raises(urllib.error.HTTPError) as err:
+            _post(server + path, payload)
+        assert err.value.code == status
+        assert "error" in json.load(err.value)
+
+    with pytest.raises(ValueError):
+        EvaluationServer(host="0.0.0.0", port=0)
+
+
+def test_server_answers_internal_errors(server, monkeypatch):
+    def fail(self, request, parts):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(Evaluator, "evaluate", fail)
+    with pytest.raises(urllib.error.HTTPError) as err:
+        _post(server + "/winners", {"election": {"culture": "p_ic"}})
+    assert err.value.code == 500
+    assert json.load(err.value) == {"error": "RuntimeError: boom"}
+
+
+def test_server_resolves_localhost():
+    srv = EvaluationServer(host="localhost", port=0)
+    try:
+        assert srv.server_address[0] in ("127.0.0.1", "::1")
+    finally:
+        srv.server_close()
@@ -0,0 +1,47 @@
+# File: tests/test_shards.py
+import os
+
+import pytest
+
+from experiments.run_experiments import main
+from experiments.shards import merge_shards, parse_shard
+
+FLAGS = ["--n_voters", "6", "--issues", "3", "--cands", "3", "--seeds", "3"]
+
+
+def _run_shards(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = str(tmp_path / f"s{i}.csv")
+        main(["--batch", "all", *FLAGS, "--shard", f"{i}/{count}", "--csv", path])
+        paths.append(path)
+    return paths
+
+
+def test_merged_shards_equal_single_run(tmp_path):
+    single = str(tmp_path / "single" / "combined.csv")
+    main(["--batch", "all", *FLAGS, "--csv", single])
+    _run_shards(tmp_path / "shards", 3)
+
+    merged = str(tmp_path / "merged" / "combined.csv")
+    main(["merge", str(tmp_path / "shards"), "--csv", merged])
+    with open(merged, "rb") as f_merged, open(single, "rb") as f_single:
+        assert f_merged.read() == f_single.read()
+
+
+def test_merge_rejects_missing_and_duplicated_cells(tmp_path):
+    paths = _run_shards(tmp_path, 2)
+    with pytest.raises(ValueError, match="missing"):
+        merge_shards(paths[:1])
+    with pytest.raises(ValueError, match="duplicated"):
+        merge_shards(paths + paths[:1])
+
+    os.remove(paths[1] + ".meta.json")
+    with pytest.raises(ValueError, match="sidecar"):
+        merge_shards(paths)
+
+
+def test_parse_shard():
+    assert parse_shard("2/5") == (2, 5)
+    with pytest.raises(ValueError):
+        parse_shard("5/5")
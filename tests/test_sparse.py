@@ -0,0 +1,39 @@
+# File: tests/test_sparse.py
+import numpy as np
+
+from core.sparse import SparseMultiIssueElection, to_sparse
+from statistical_cultures.p_ic import PICConfig, sample_p_ic
+from statistical_cultures.disjoint import DisjointConfig, sample_disjoint
+from experiments.registry import get_rule, rule_names
+from free_riding.risk import evaluate_risk
+from free_riding.welfare import welfare_summary
+
+
+def test_sparse_round_trip_and_accessors():
+    elec = sample_p_ic(PICConfig(n_voters=6, candidates_per_issue=[2, 7, 3], p=0.2, seed=1))
+    sparse = to_sparse(elec)
+
+    assert sparse.n_approvals == int(elec.columns.sum())
+    assert np.array_equal(sparse.to_dense().columns, elec.columns)
+    for v in range(6):
+        assert np.array_equal(sparse.voter_row(v), elec.voter_row(v))
+    dropped = sparse.drop_approvals([0, 1], 1, 3)
+    assert not dropped.approves(0, 1, 3) and not dropped.approves(1, 1, 3)
+
+
+def test_sparse_rules_and_detector_match_dense():
+    elecs = [
+        sample_p_ic(PICConfig(n_voters=12, candidates_per_issue=[6, 6, 6, 6], p=0.15, seed=2)),
+        sample_disjoint(DisjointConfig(n_voters=12, candidates_per_issue=[4, 9, 5], n_groups=3, p=0.7, seed=3)),
+    ]
+    for elec in elecs:
+        sparse = SparseMultiIssueElection.from_dense(elec)
+        for name in rule_names(12):
+            rule = get_rule(name)
+            assert rule(sparse).winners == rule(elec).winners
+            assert evaluate_risk(sparse, rule) == evaluate_risk(elec, rule)
+
+        winners = get_rule("thiele_x1")(elec)
+        dense_w, sparse_w = welfare_summary(elec, winners), welfare_summary(sparse, winners)
+        for key in dense_w:
+            assert np.isclose(dense_w[key], sparse_w[key])
@@ -0,0 +1,111 @@
+# File: tests/test_sweep.py
+import numpy as np
+import pytest
+
+from experiments.sweep import parse_values, expand_grid, update_store, load_store, INDEX_COLUMNS, SweepCell
+from experiments.adaptive import adaptive_sweep, save_to_store
+from experiments.cube import build_cube
+from experiments import adaptive
+from experiments.worker import METRICS
+
+
+def test_parse_values_ranges_and_lists():
+    assert parse_values("0.1:0.5:0.2", "p") == [0.1, 0.3, 0.5]
+    assert parse_values("10,20", "n_voters") == [10, 20]
+    assert parse_values("4", "cands") == [4]
+
+
+def test_expand_grid_deduplicates_irrelevant_parameters():
+    grid = {"phi": [0.2, 0.8], "p": [0.3, 0.6]}
+    cells = expand_grid(grid, ["p_ic", "resampling"], rules=["utilitarian"])
+
+    # p-IC ignores phi, so only the resampling cells are multiplied by it
+    assert sum(c.culture == "p_ic" for c in cells) == 2
+    assert sum(c.culture == "resampling" for c in cells) == 4
+    assert len(set(cells)) == len(cells)
+
+
+def test_update_store_reuses_existing_cells(tmp_path):
+    out = str(tmp_path / "sweep.csv")
+    cells = expand_grid({"n_voters": [4], "issues": [2], "cands": [2]}, ["p_ic"], rules=["utilitarian"])
+    update_store(out, cells, seeds=2)
+    more = expand_grid({"n_voters": [4, 5], "issues": [2], "cands": [2]}, ["p_ic"], rules=["utilitarian"])
+    store = update_store(out, more, seeds=2)
+
+    assert len(store) == 2
+    assert len(load_store(out)) == 2
+    assert set(store["seeds"]) == {2}
+
+
+def test_expand_grid_accepts_registry_rules_and_rejects_unknown():
+    cells = expand_grid({"n_voters": [3, 5]}, ["p_ic"], rules=["thiele_x2", "owa_x3"])
+    # owa_x3 needs at least 4 voters
+    assert [(c.rule, c.n_voters) for c in cells] == [("thiele_x2", 3), ("thiele_x2", 5), ("owa_x3", 5)]
+    with pytest.raises(ValueError, match="Unknown rule"):
+        expand_grid({}, ["p_ic"], rules=["thiele_x1", "thiel_x1"])
+    with pytest.raises(ValueError, match="Unknown rule"):
+        adaptive_sweep(["p_ic"], ["borda"], "p", 0.1, 0.9, budget=0)
+
+
+def test_adaptive_sweep_refines_within_budget(tmp_path):
+    fixed = {"n_voters": 5, "issues": 2, "cands": 2}
+    store = adaptive_sweep(["p_ic"], ["owa_leximin"], "p", 0.1, 0.9, budget=1500,
+                           fixed=fixed, init_points=3, seeds=4, metric="success_rate")
+    assert list(store.columns[:len(INDEX_COLUMNS)]) == INDEX_COLUMNS
+    assert len(store) >= 3 and store["phi"].isna().all()
+
+    out = str(tmp_path / "sweep.csv")
+    update_store(out, expand_grid({**{k: [v] for k, v in fixed.items()}, "p": [0.5]}, ["p_ic"],
+                                  rules=["owa_leximin"]), seeds=4)
+    merged = save_to_store(out, store)
+    assert len(merged) == len(store)  # the p = 0.5 cell is replaced, not duplicated
+    assert set(build_cube([merged])["family"]) == {"owa_leximin"}
+
+
+def test_adaptive_sweep_concentrates_points_at_transitions(monkeypatch):
+    def fake_evaluate(cell, seeds):
+        rng = np.random.default_rng([int(cell.p * 1e6)] + list(seeds))
+        risk = (cell.p > 0.62) * 0.5 + rng.normal(0, 0.01, len(seeds))
+        return [{"culture": cell.culture, "rule": cell.rule, "eligible": 8,
+                 **dict.fromkeys(METRICS, 0.0), "risk": r} for r in risk]
+
+    monkeypatch.setattr(adaptive, "_evaluate", fake_evaluate)
+    store = adaptive.adaptive_sweep(["p_ic"], ["utilitarian"], "p", 0.0, 1.0, budget=3000, seeds=10)
+    p = np.sort(store["p"].astype(float).to_numpy())
+    # The jump is bracketed to the minimum width (1/256); a uniform grid with
+    # the same budget (~30 points of 10 seeds) only gets within 1/29
+    below, above = p[p <= 0.62].max(), p[p > 0.62].min()
+    assert above - below < 1 / 128
+
+
+def test_adaptive_split_needs_a_significant_difference():
+    curve = adaptive.Curve(SweepCell(culture="p_ic", rule="utilitarian", n_voters=10, issues=3, cands=3, p=0.5), "p")
+    noise = [-1.0, 1.0] * 5
+    curve.points[0.0] = [{"risk": r, "eligible": 0} for r in noise]
+    # the change exceeds either point's CI half-width, but not the CI of the difference
+    curve.points[0.5] = [{"risk": r + 0.8, "eligible": 0} for r in noise]
+    assert curve.stats(0.0)[1] < 0.8 < adaptive.Z_95 * np.sqrt(2) * curve.mean_se(0.0)[1]
+    assert [step[1] for step in curve.candidates(0.01, 10, 160)] == ["seeds"]
+
+    curve.points[0.5] = [{"risk": r + 1.5, "eligible": 0} for r in noise]
+    assert [step[1] for step in curve.candidates(0.01, 10, 160)] == ["split"]
+    # ends that agree by chance get seeds, not a split; at max_seeds nothing is left to do
+    curve.points = {v: [{"risk": 0.0, "eligible": 0}] * 10 for v in (0.0, 0.5)}
+    assert [step[1] for step in curve.candidates(0.01, 10, 160)] == ["seeds"]
+    assert curve.candidates(0.01, 10, 10) == []
+
+
+def test_adaptive_sweep_does_not_split_on_sampling_noise(monkeypatch):
+    def fake_evaluate(cell, seeds):
+        # a flat, rare-event rate: most seeds see no success at all
+        rng = np.random.default_rng([int(cell.p * 1e6)] + list(seeds))
+        rates = rng.binomial(20, 0.002, len(seeds)) / 20
+        return [{"culture": cell.culture, "rule": cell.rule, "eligible": 8,
+                 **dict.fromkeys(METRICS, 0.0), "success_rate": r} for r in rates]
+
+    monkeypatch.setattr(adaptive, "_evaluate", fake_evaluate)
+    store = adaptive.adaptive_sweep(["p_ic"], ["utilitarian"], "p", 0.0, 1.0, budget=20000,
+                                    seeds=4, metric="success_rate")
+    assert sorted(store["p"].astype(float)) == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert store["success_rate"].max() > 0
+    assert (store["seeds"] > 4).all()
@@ -0,0 +1,124 @@
+# File: voting_rules/base.py
+# Common base for rule objects.
+#
+# A rule object holds its parameter and caches the weight tables it needs per
+# election shape, so repeated calls on elections of the same shape (as done by
+# the free-riding detector) do not rebuild them. Rule objects are callable like
+# the plain rule functions (rule(elec) -> Outcome), hashable, and picklable so
+# they can be shipped to process-pool workers.
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from core.types import MultiIssueElection, Outcome
+
+# Voters per block in the chunked (out-of-core) engines
+CHUNK_VOTERS = 1 << 18
+
+
+def voter_chunks(n_voters: int, chunk_voters: int = CHUNK_VOTERS) -> Iterator[Tuple[int, int]]:
+    """(start, stop) ranges covering the voters in blocks of `chunk_voters`."""
+    for start in range(0, n_voters, chunk_voters):
+        yield start, min(start + chunk_voters, n_voters)
+
+
+def is_memmapped(elec) -> bool:
+    """True for dense elections whose approvals live in a memory-mapped file."""
+    return isinstance(getattr(elec, "approvals", None), np.memmap)
+
+
+class SequentialRule:
+    """
+    Base class of the sequential rule objects.
+
+    Subclasses implement `_build_tables` (optional) and `_run`.
+    """
+
+    def __init__(self, x: Optional[int] = None):
+        self.x = x
+        self._tables: Dict[Tuple, Any] = {}
+
+    def tables(self, elec: MultiIssueElection):
+        """Precomputed tables for the shape of `elec` (built once per shape)."""
+        shape = elec.shape_key
+        tables = self._tables.get(shape)
+        if tables is None:
+            tables = self._build_tables(elec.n_voters, elec.n_issues, elec.candidates_per_issue)
+            self._tables[shape] = tables
+        return tables
+
+    def _build_tables(self, n_voters: int, n_issues: int, n_cands: int):
+        return None
+
+    def _run(self, elec: MultiIssueElection, tables, record: Optional[List] = None) -> Outcome:
+        """Run the rule; if `record` is a list, append each issue's candidate scores to it."""
+        raise NotImplementedError
+
+    def _run_sparse(self, elec, tables, record: Optional[List] = None) -> Outcome:
+        """Same as `_run` for a `core.sparse.SparseMultiIssueElection`."""
+        raise NotImplementedError(f"{type(self).__name__} has no sparse implementation")
+
+    def _run_chunked(self, elec: MultiIssueElection, tables, record: Optional[List] = None,
+                     chunk_voters: int = CHUNK_VOTERS) -> Outcome:
+        """
+        Same as `_run`, reading the approvals `chunk_voters` voters at a time so
+        that only per-voter running state and one block are held in memory.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no chunked implementation")
+
+    def _runner(self, elec):
+        if getattr(elec, "is_sparse", False):
+            return self._run_sparse
+        if is_memmapped(elec):
+            return self._run_chunked
+        return self._run
+
+    def run_chunked(self, elec: MultiIssueElection, chunk_voters: int = CHUNK_VOTERS) -> Outcome:
+        """Run the chunked engine explicitly (memory-mapped elections use it automatically)."""
+        return self._run_chunked(elec, self.tables(elec), chunk_voters=chunk_voters)
+
+    def __call__(self, elec: MultiIssueElection) -> Outcome:
+        return self._runner(elec)(elec, self.tables(elec))
+
+    def trace(self, elec: MultiIssueElection) -> Tuple[Outcome, List[np.ndarray]]:
+        """Outcome plus the candidate scores the rule compared on every issue."""
+        record: List[np.ndarray] = []
+        out = self._runner(elec)(elec, self.tables(elec), record)
+        return out, record
+
+    def sensitivity(self, elec: MultiIssueElection, winners: List[int], voter: int, issue: int):
+        """
+        Bounds on how much one voter dropping their approval of winners[issue]
+        moves the scores, given the outcome `winners`:
+          (drop_lo, drop_hi, later_shift)
+        • the winner's score on `issue` falls by an amount in [drop_lo, drop_hi]
+          (other candidates on `issue` are unaffected);
+        • on later issues, as long as no winner changes, the scores of any two
+          candidates move relative to each other by at most later_shift: one
+          bound for all later issues, or an array over the issues (entries
+          after `issue` are used; 0 means the scores do not move at all).
+        Effects of several voters add up. None means no bounds are known.
+        """
+        return None
+
+    def voter_sensitivity(self, elec: MultiIssueElection, winners: List[int], voter: int) -> List:
+        """`sensitivity` for every issue; rules override it to share the per-voter work."""
+        return [self.sensitivity(elec, winners, voter, i) for i in range(elec.n_issues)]
+
+    # --- identity: two rule objects are equal iff same class and parameter ---
+    def _key(self) -> Tuple:
+        return (type(self).__name__, self.x)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SequentialRule) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __reduce__(self):
+        # Tables are a cache; rebuild them on the other side instead of pickling them
+        return (type(self), () if self.x is None else (self.x,))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()" if self.x is None else f"{type(self).__name__}(x={self.x})"
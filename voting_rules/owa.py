@@ -12,6 +12,8 @@ from typing import List
 import numpy as np
 
 from core.types import MultiIssueElection, Outcome
+from core.sparse import issue_columns
+from voting_rules.base import CHUNK_VOTERS, SequentialRule, voter_chunks
 
 def _alpha_vector(n_voters: int, n_issues: int, x: int) -> np.ndarray:
     """
@@ -31,7 +33,20 @@ def _alpha_vector(n_voters: int, n_issues: int, x: int) -> np.ndarray:
     tail_len = x  # number of trailing entries to replace by the geometric tail
 
     if tail_len > 0:
-        tail = np.array([1.0 / ((k * n) ** t) for t in range(1, tail_len + 1)], dtype=float)
+        # Entries below the smallest float are 0; once one is, all later ones
+        # are too, so large electorates (leximin: x = n-1) stop after a few
+        # hundred terms. Past float range, int / int division still rounds
+        # correctly (to a subnormal or 0) where 1.0 / int would overflow.
+        tail = np.zeros(tail_len, dtype=float)
+        for t in range(1, tail_len + 1):
+            denom = (k * n) ** t
+            try:
+                value = 1.0 / denom
+            except OverflowError:
+                value = 1 / denom
+            if value == 0.0:
+                break
+            tail[t - 1] = value
         alpha[-tail_len:] = tail  # replace the last x entries
 
     # α must be nonincreasing; with k,n >= 1 this holds automatically.
@@ -49,7 +64,7 @@ def _satisfaction_vector(elec: MultiIssueElection, winners: List[int]) -> np.nda
     for i in range(decided):
         w = winners[i]
         # voters who approved winner on issue i
-        s += elec.approvals[:, i, w]
+        s += elec.issue(i)[:, w]
     return s
 
 
@@ -63,6 +78,144 @@ def _owa_score(s: np.ndarray, alpha: np.ndarray) -> float:
     return float(np.dot(alpha, s_sorted))
 
 
+class OWARule(SequentialRule):
+    """
+    Sequential α^(x)-OWA rule as a rule object.
+
+    α^(x) is built once per election shape, and voter satisfactions are
+    carried forward from issue to issue instead of being recomputed from
+    scratch for every tentative candidate.
+    """
+
+    def __init__(self, x: int = 1):
+        super().__init__(x)
+
+    def _param(self, n_voters: int) -> int:
+        return self.x
+
+    def _build_tables(self, n_voters: int, n_issues: int, n_cands: int) -> np.ndarray:
+        return _alpha_vector(n_voters, n_issues, self._param(n_voters))
+
+    def _run(self, elec: MultiIssueElection, alpha: np.ndarray, record=None) -> Outcome:
+        s = np.zeros(elec.n_voters, dtype=float)
+
+        winners: List[int] = []
+        for i in range(elec.n_issues):
+            approvals = elec.issue(i)
+            # column c holds the sorted satisfactions if c wins issue i
+            tentative = np.sort(s[:, None] + approvals, axis=0).T.copy()
+            best_score = -1e100
+            best_cand = 0
+            scores = []
+            for c in range(tentative.shape[0]):
+                score = float(np.dot(alpha, tentative[c]))
+                scores.append(score)
+                if score > best_score:
+                    best_score = score
+                    best_cand = c
+            if record is not None:
+                record.append(np.array(scores))
+            winners.append(best_cand)
+            s += approvals[:, best_cand]
+
+        return Outcome(winners=winners)
+
+    def _run_sparse(self, elec, alpha: np.ndarray, record=None) -> Outcome:
+        # Satisfactions are small integers, so a sorted satisfaction vector is
+        # described by its histogram: value v fills the sorted positions
+        # [start_v, end_v) and contributes v * (S[start_v] - S[end_v]) with S the
+        # suffix sums of α (summed from the tiny tail up, so the tail keeps its
+        # precision). Approving c moves c's approvers up by one value, so each
+        # candidate only costs its own approvals.
+        # Candidates within rounding distance of the best are re-scored with the
+        # exact dense computation, so ties resolve as in `_run`.
+        n_issues = elec.n_issues
+        suffix = np.concatenate([np.cumsum(alpha[::-1])[::-1], [0.0]])
+        values = np.arange(n_issues + 2, dtype=float)
+        s = np.zeros(elec.n_voters, dtype=np.int64)
+
+        winners: List[int] = []
+        for i in range(n_issues):
+            data = issue_columns(elec, i)
+            hist = np.bincount(s, minlength=n_issues + 2)
+            moved = np.zeros((len(data["counts"]), n_issues + 2), dtype=np.int64)
+            np.add.at(moved, (data["cands"], s[data["voters"]]), 1)
+            new = hist[None, :] - moved
+            new[:, 1:] += moved[:, :-1]
+            ends = np.cumsum(new, axis=1)
+            scores = ((suffix[ends - new] - suffix[ends]) * values).sum(axis=1)
+            top = scores.max()
+            for c in np.flatnonzero(scores >= top - 1e-9 * max(1.0, abs(top))):
+                scores[c] = float(np.dot(alpha, np.repeat(values, new[c])))
+            if record is not None:
+                record.append(scores)
+            best_cand = int(np.argmax(scores))
+            winners.append(best_cand)
+            start = int(np.sum(data["counts"][:best_cand]))
+            s[data["voters"][start:start + data["counts"][best_cand]]] += 1
+
+        return Outcome(winners=winners)
+
+    def _run_chunked(self, elec, alpha: np.ndarray, record=None, chunk_voters=CHUNK_VOTERS) -> Outcome:
+        # As in `_run_sparse`, a sorted satisfaction vector is described by its
+        # histogram. Per issue, one pass over the voters accumulates, for every
+        # candidate c, the histogram of s + approvals[:, c]; the scores then
+        # follow from the suffix sums of α without any per-voter sort.
+        # Candidates within rounding distance of the best (all of them when
+        # scores are recorded) are re-scored as the dense dot product of α with
+        # the expanded histogram, which is exactly the sorted vector of `_run`.
+        n_issues = elec.n_issues
+        n_values = n_issues + 2
+        offsets = elec.column_offsets
+        suffix = np.concatenate([np.cumsum(alpha[::-1])[::-1], [0.0]])
+        values = np.arange(n_values, dtype=float)
+        s = np.zeros(elec.n_voters, dtype=np.int32)
+
+        winners: List[int] = []
+        prev_col = None
+        for i in range(n_issues):
+            lo, hi = offsets[i], offsets[i + 1]
+            bins = np.arange(hi - lo) * n_values
+            hist = np.zeros((hi - lo, n_values), dtype=np.int64)
+            for start, stop in voter_chunks(elec.n_voters, chunk_voters):
+                rows = np.asarray(elec.columns[start:stop])
+                if prev_col is not None:
+                    s[start:stop] += rows[:, prev_col]
+                tentative = s[start:stop, None] + rows[:, lo:hi] + bins
+                hist += np.bincount(tentative.ravel(), minlength=len(bins) * n_values).reshape(hist.shape)
+            ends = np.cumsum(hist, axis=1)
+            scores = ((suffix[ends - hist] - suffix[ends]) * values).sum(axis=1)
+            top = scores.max()
+            exact = range(len(scores)) if record is not None else \
+                np.flatnonzero(scores >= top - 1e-9 * max(1.0, abs(top)))
+            for c in exact:
+                scores[c] = float(np.dot(alpha, np.repeat(values, hist[c])))
+            if record is not None:
+                record.append(scores)
+            best_cand = int(np.argmax(scores))
+            winners.append(best_cand)
+            prev_col = lo + best_cand
+
+        return Outcome(winners=winners)
+
+    def sensitivity(self, elec, winners, voter, issue):
+        # Lowering one integer satisfaction by 1 lowers exactly one entry of the
+        # sorted vector by 1, i.e. the OWA value by some α_r in [α_min, α_max].
+        alpha = self.tables(elec)
+        lo, hi = float(alpha.min()), float(alpha.max())
+        return (lo, hi, hi - lo)
+
+
+class LeximinOWARule(OWARule):
+    """Leximin limit of the Section 5 family: x = n_voters - 1 for each election."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    def _param(self, n_voters: int) -> int:
+        return n_voters - 1
+
+
 def owa_rule(elec: MultiIssueElection, x: int) -> Outcome:
     """
     Sequential α^(x)-OWA rule (Section 2.2), using the family from Section 5.
@@ -78,27 +231,7 @@ def owa_rule(elec: MultiIssueElection, x: int) -> Outcome:
     -------
     Outcome with one winner per issue.
     """
-    n_voters = elec.n_voters
-    n_issues = elec.n_issues
-    n_cands = elec.candidates_per_issue
-
-    alpha = _alpha_vector(n_voters, n_issues, x)
-
-    winners: List[int] = []
-    for i in range(n_issues):
-        best_score = -1e100
-        best_cand = 0
-        # Try each candidate for the current issue i
-        for c in range(n_cands):
-            tentative = winners + [c]
-            s = _satisfaction_vector(elec, tentative)
-            score = _owa_score(s, alpha)
-            if score > best_score:
-                best_score = score
-                best_cand = c
-        winners.append(best_cand)
-
-    return Outcome(winners=winners)
+    return OWARule(x)(elec)
 
 
 def leximin_owa(elec: MultiIssueElection) -> Outcome:
@@ -107,4 +240,4 @@ def leximin_owa(elec: MultiIssueElection) -> Outcome:
     x = n_voters - 1.
     (Note: strictly positive α; not the zero-heavy vector I used before.)
     """
-    return owa_rule(elec, x=elec.n_voters - 1)
+    return LeximinOWARule()(elec)
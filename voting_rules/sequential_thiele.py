@@ -1,5 +1,7 @@
 import numpy as np
 from core.types import MultiIssueElection, Outcome
+from core.sparse import issue_columns
+from voting_rules.base import CHUNK_VOTERS, SequentialRule, voter_chunks
 
 
 def thiele_score_vector(x: int, max_support: int):
@@ -15,6 +17,117 @@ def thiele_score_vector(x: int, max_support: int):
         return [1 / ((i + 1) ** x) for i in range(max_support)]
 
 
+class ThieleRule(SequentialRule):
+    """
+    Generic sequential Thiele method as a rule object (parameterized by x).
+
+    The weight vector is built once per election shape; as in the original
+    formulation its length is the number of candidates per issue (the largest
+    one for ragged elections), later supports reuse the last weight. Candidate scores are
+    accumulated over voters in index order, exactly like the per-voter loop,
+    so ties resolve identically.
+    """
+
+    def __init__(self, x: int = 1):
+        super().__init__(x)
+
+    def _build_tables(self, n_voters: int, n_issues: int, n_cands: int) -> np.ndarray:
+        return np.asarray(thiele_score_vector(self.x, n_cands), dtype=float)
+
+    def _run(self, elec: MultiIssueElection, weights: np.ndarray, record=None) -> Outcome:
+        # support[v] = number of earlier winners approved by voter v
+        support = np.zeros(elec.n_voters, dtype=np.int64)
+
+        winners = []
+        for issue in range(elec.n_issues):
+            approved = elec.issue(issue) == 1
+            voter_weight = weights[np.minimum(support, len(weights) - 1)]
+            contrib = np.where(approved, voter_weight[:, None], 0.0)
+            issue_scores = np.cumsum(contrib, axis=0)[-1]
+            if record is not None:
+                record.append(issue_scores)
+            chosen = int(np.argmax(issue_scores))
+            winners.append(chosen)
+
+            # update support of voters who approved chosen
+            support += approved[:, chosen]
+
+        return Outcome(winners=winners)
+
+    def _run_sparse(self, elec, weights: np.ndarray, record=None) -> Outcome:
+        # Only approving voters contribute; each candidate's score is summed
+        # over its approvers in index order, as in the dense version.
+        support = np.zeros(elec.n_voters, dtype=np.int64)
+
+        winners = []
+        for issue in range(elec.n_issues):
+            data = issue_columns(elec, issue)
+            contrib = weights[np.minimum(support[data["voters"]], len(weights) - 1)]
+            bounds = np.concatenate([[0], np.cumsum(data["counts"])])
+            issue_scores = np.zeros(len(data["counts"]))
+            for c in np.flatnonzero(data["counts"]):
+                issue_scores[c] = np.cumsum(contrib[bounds[c]:bounds[c + 1]])[-1]
+            if record is not None:
+                record.append(issue_scores)
+            chosen = int(np.argmax(issue_scores))
+            winners.append(chosen)
+
+            support[data["voters"][bounds[chosen]:bounds[chosen + 1]]] += 1
+
+        return Outcome(winners=winners)
+
+    def _run_chunked(self, elec, weights: np.ndarray, record=None, chunk_voters=CHUNK_VOTERS) -> Outcome:
+        # One pass over the voters per issue. The running score row is carried
+        # from block to block, so each candidate's score is still summed over
+        # voters in index order and equals the dense result bit for bit. The
+        # support of a block is brought up to date with the previous winner's
+        # column while the block is in memory anyway.
+        offsets = elec.column_offsets
+        support = np.zeros(elec.n_voters, dtype=np.int32)
+
+        winners = []
+        prev_col = None
+        for issue in range(elec.n_issues):
+            lo, hi = offsets[issue], offsets[issue + 1]
+            issue_scores = np.zeros(hi - lo)
+            for start, stop in voter_chunks(elec.n_voters, chunk_voters):
+                rows = np.asarray(elec.columns[start:stop])
+                if prev_col is not None:
+                    support[start:stop] += rows[:, prev_col]
+                approved = rows[:, lo:hi] == 1
+                voter_weight = weights[np.minimum(support[start:stop], len(weights) - 1)]
+                contrib = np.where(approved, voter_weight[:, None], 0.0)
+                issue_scores = np.cumsum(np.vstack([issue_scores, contrib]), axis=0)[-1]
+            if record is not None:
+                record.append(issue_scores)
+            chosen = int(np.argmax(issue_scores))
+            winners.append(chosen)
+            prev_col = lo + chosen
+
+        return Outcome(winners=winners)
+
+    def sensitivity(self, elec, winners, voter, issue):
+        return self.voter_sensitivity(elec, winners, voter)[issue]
+
+    def voter_sensitivity(self, elec, winners, voter):
+        weights = self.tables(elec)
+        last = len(weights) - 1
+        row = elec.voter_row(voter)
+        starts = elec.column_offsets[:-1]
+        approved = row[starts + np.asarray(winners)] == 1
+        # support before each issue and the weight the voter has there
+        support = np.concatenate([[0], np.cumsum(approved)[:-1]])
+        w = weights[np.minimum(support, last)]
+        # After dropping an earlier approval the voter's support on a later
+        # issue is one lower, raising their weight by the step below it (0
+        # once clamped to the last weight); it only moves the scores of an
+        # issue where the voter approves some candidate.
+        steps = np.append(weights[:-1] - weights[1:], 0.0)
+        gain = steps[np.minimum(np.maximum(support - 1, 0), last)]
+        later = np.where((support >= 1) & (np.add.reduceat(row, starts) > 0), gain, 0.0)
+        return [(float(w[i]), float(w[i]), later) for i in range(elec.n_issues)]
+
+
 def sequential_thiele(elec: MultiIssueElection, x: int = 1) -> Outcome:
     """
     Generic sequential Thiele method (parameterized by x).
@@ -22,27 +135,7 @@ def sequential_thiele(elec: MultiIssueElection, x: int = 1) -> Outcome:
     - x = 0 → utilitarian
     - larger x values interpolate toward CC
     """
-    winners = []
-    scores = np.zeros((elec.n_voters, elec.candidates_per_issue))
-
-    weight_vector = thiele_score_vector(x, elec.candidates_per_issue)
-
-    for issue in range(elec.n_issues):
-        issue_scores = np.zeros(elec.candidates_per_issue)
-        for voter in range(elec.n_voters):
-            for cand in range(elec.candidates_per_issue):
-                if elec.approvals[voter, issue, cand] == 1:
-                    support = int(np.sum(scores[voter, :]))
-                    issue_scores[cand] += weight_vector[min(support, len(weight_vector) - 1)]
-        chosen = int(np.argmax(issue_scores))
-        winners.append(chosen)
-
-        # update scores for voters who approved chosen
-        for voter in range(elec.n_voters):
-            if elec.approvals[voter, issue, chosen] == 1:
-                scores[voter, chosen] += 1
-
-    return Outcome(winners=winners)
+    return ThieleRule(x)(elec)
 
 
 # Convenience wrappers for common variants
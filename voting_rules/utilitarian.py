@@ -1,14 +1,44 @@
 import numpy as np
 from core.types import MultiIssueElection, Outcome
+from voting_rules.base import CHUNK_VOTERS, SequentialRule, voter_chunks
+
+
+class UtilitarianRule(SequentialRule):
+    """Sequential utilitarian rule as a rule object (no parameter, no tables)."""
+
+    def _run(self, elec: MultiIssueElection, tables, record=None) -> Outcome:
+        # Issues are independent: one column sum per candidate
+        totals = elec.column_counts() if elec.is_sparse else elec.columns.sum(axis=0)
+        return self._choose(elec, totals, record)
+
+    _run_sparse = _run
+
+    def _run_chunked(self, elec: MultiIssueElection, tables, record=None, chunk_voters=CHUNK_VOTERS) -> Outcome:
+        # Column sums are integers, so summing them block by block is exact
+        totals = np.zeros(int(elec.column_offsets[-1]), dtype=np.int64)
+        for start, stop in voter_chunks(elec.n_voters, chunk_voters):
+            totals += elec.columns[start:stop].sum(axis=0)
+        return self._choose(elec, totals, record)
+
+    @staticmethod
+    def _choose(elec, totals: np.ndarray, record=None) -> Outcome:
+        offsets = elec.column_offsets
+        winners = []
+        for issue in range(elec.n_issues):
+            scores = totals[offsets[issue]:offsets[issue + 1]]
+            if record is not None:
+                record.append(scores.astype(float))
+            winners.append(int(np.argmax(scores)))
+        return Outcome(winners=winners)
+
+    def sensitivity(self, elec, winners, voter, issue):
+        # One approval less on `issue`; later issues are independent
+        return (1.0, 1.0, 0.0)
+
 
 def sequential_utilitarian(elec: MultiIssueElection) -> Outcome:
     """
     Sequential utilitarian rule:
     For each issue, pick the candidate with the highest number of approvals.
     """
-    winners = []
-    for issue in range(elec.n_issues):
-        issue_scores = elec.approvals[:, issue, :].sum(axis=0)
-        chosen = int(np.argmax(issue_scores))
-        winners.append(chosen)
-    return Outcome(winners=winners)
+    return UtilitarianRule()(elec)